@@ -39,4 +39,11 @@ def create_app(test_config=None):
     from app import routes
     app.register_blueprint(routes.bp)
 
+    # In-memory corpus structures (built once, read-only afterwards)
+    from app import cache, corpus, http_cache, refinement
+    corpus.init_app(app)
+    cache.init_app(app)
+    refinement.init_app(app)
+    http_cache.init_app(app)
+
     return app
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""Versioned offline bundle of the corpus and deltas between versions.
+
+``/bundle`` serves one snapshot of every corpus table (the full text, the
+lemma occurrences and the definitions) plus the decoded postags, so a client
+can read and look words up without the API. Each table is sent as column
+names, primary-key columns and row arrays. The snapshot is rendered and
+compressed once per corpus content version, on the first request for it
+rather than at startup.
+
+Each version's snapshot is also written to BUNDLE_DIR (default
+``<instance>/bundles``). ``/bundle/delta?since=<version>`` compares a stored
+snapshot with the current one and returns only the rows that were added,
+changed or removed.
+"""
+import gzip
+import json
+import logging
+import os
+import re
+
+from flask import current_app
+
+from app import corpus, db
+from app.corpus import VERSIONED_MODELS, get_content_version
+from app.page_store import RenderedBody
+from app.postag_table import get_postag_table
+from app.utils import API_VERSION
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'bundle'
+
+_VERSION = re.compile(r'^[0-9a-f]{16}$')
+
+
+def is_version(value):
+    return bool(value) and _VERSION.match(value) is not None
+
+
+def table_snapshot(session, model):
+    """{"columns", "key", "rows"} for one table, rows in primary-key order."""
+    table = model.__table__
+    key = list(table.primary_key.columns)
+    return {
+        'columns': [column.name for column in table.columns],
+        'key': [column.name for column in key],
+        'rows': [list(row) for row in session.query(*table.columns).order_by(*key)],
+    }
+
+
+def _keyed(snapshot):
+    positions = [snapshot['columns'].index(name) for name in snapshot['key']]
+    return {tuple(row[i] for i in positions): row for row in snapshot['rows']}
+
+
+def table_delta(old, new):
+    """Rows of ``new`` that are missing or different in ``old``, and keys of ``old`` rows that are gone.
+
+    If the columns changed, every row is sent again.
+    """
+    if old['columns'] != new['columns'] or old['key'] != new['key']:
+        old = {'columns': new['columns'], 'key': new['key'], 'rows': []}
+    old_rows = _keyed(old)
+    new_rows = _keyed(new)
+    return {
+        'columns': new['columns'],
+        'key': new['key'],
+        'upsert': [row for key, row in new_rows.items() if old_rows.get(key) != row],
+        'delete': [list(key) for key in old_rows if key not in new_rows],
+    }
+
+
+class Bundle:
+    """The snapshot of one corpus version and its rendered, compressed body."""
+
+    def __init__(self, payload, render):
+        self.payload = payload
+        self.version = payload['version']
+        self.rendered = RenderedBody(render(payload))
+
+    @classmethod
+    def from_session(cls, session, render):
+        postags = get_postag_table()
+        return cls({
+            'version': get_content_version(),
+            'apiVersion': API_VERSION,
+            'tables': {model.__tablename__: table_snapshot(session, model) for model in VERSIONED_MODELS},
+            'postags': {tag: postags.decode(tag) for tag in postags if tag},
+        }, render)
+
+    def save(self, directory):
+        """Keep this version's snapshot so later versions can send deltas against it."""
+        path = os.path.join(directory, f"{self.version}.json.gz")
+        if os.path.exists(path):
+            return
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.rendered.encodings['gzip'])
+
+    def delta(self, old):
+        """Payload taking a client from snapshot ``old`` to this one."""
+        tables = {}
+        for name, snapshot in self.payload['tables'].items():
+            empty = {'columns': snapshot['columns'], 'key': snapshot['key'], 'rows': []}
+            tables[name] = table_delta(old['tables'].get(name, empty), snapshot)
+
+        postag_column = self.payload['tables']['lemma_data']['columns'].index('postag')
+        tags = {row[postag_column] for row in tables['lemma_data']['upsert']}
+        return {
+            'version': self.version,
+            'since': old['version'],
+            'apiVersion': API_VERSION,
+            'tables': tables,
+            'postags': {tag: features for tag, features in self.payload['postags'].items() if tag in tags},
+        }
+
+
+def bundle_dir():
+    return current_app.config.get('BUNDLE_DIR') or os.path.join(current_app.instance_path, 'bundles')
+
+
+def _snapshot_path(version):
+    return os.path.join(bundle_dir(), f"{version}.json.gz")
+
+
+def has_snapshot(version):
+    """True if a delta from ``version`` can be served; does not read the snapshot."""
+    if version == get_content_version():
+        return True
+    return is_version(version) and os.path.exists(_snapshot_path(version))
+
+
+def load_snapshot(version):
+    """Stored snapshot of ``version``, or None if it was never saved here."""
+    if version == get_content_version():
+        return get_bundle().payload
+    if not is_version(version):
+        return None
+    try:
+        with open(_snapshot_path(version), 'rb') as f:
+            return json.loads(gzip.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+
+
+def _build_bundle():
+    bundle = Bundle.from_session(db.session, lambda payload: current_app.json.response(payload).get_data())
+    try:
+        bundle.save(bundle_dir())
+    except OSError as e:
+        logger.warning(f"Bundle {bundle.version} not saved, deltas against it will be unavailable: {str(e)}")
+    sizes = ', '.join(f"{encoding or 'identity'} {len(data)}" for encoding, data in bundle.rendered.encodings.items())
+    logger.info(f"Built offline bundle {bundle.version} ({sizes} bytes)")
+    return bundle
+
+
+# Several MB to render and compress, so only built once someone asks for it
+corpus.register(INDEX_NAME, _build_bundle, eager=False)
+
+
+def get_bundle():
+    return corpus.get(INDEX_NAME)
@@ -0,0 +1,88 @@
+"""Bounded LRU + TTL cache for serialized API responses.
+
+Entries are final JSON bytes (and, for grouped search paging, the ordered
+lemma groups every page of a query slices) keyed by a tuple that starts with
+the corpus content version, so a new database never serves stale bodies;
+old-version entries simply age out of the LRU.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from flask import current_app
+
+EXTENSION_KEY = 'response_cache'
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 3600
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry expiry and hit/miss/eviction counters."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def init_app(app):
+    app.extensions[EXTENSION_KEY] = ResponseCache(
+        max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+        ttl=app.config.get('RESPONSE_CACHE_TTL', DEFAULT_TTL_SECONDS),
+    )
+
+
+def get_response_cache():
+    return current_app.extensions[EXTENSION_KEY]
@@ -0,0 +1,110 @@
+"""Prefix trie for typeahead completions.
+
+Every distinct lemma and surface form is inserted under its accent-stripped
+Greek key and its Beta Code keys (with and without diacritics). Each trie
+node stores its best completions, ranked by corpus frequency, so answering a
+keystroke costs one walk down the typed prefix.
+"""
+import logging
+
+from app import corpus, db
+from app.models import LemmaData
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'completion_index'
+
+MAX_COMPLETIONS = 20
+DEFAULT_COMPLETIONS = 8
+
+# Columns whose values complete to the lemma / to the surface form
+LEMMA_KEYS = ('normalized', 'eng_lemma', 'full_eng')
+FORM_KEYS = ('norm_form', 'norm_form_eng', 'form_eng')
+
+
+def completion_key(text):
+    return text.casefold()
+
+
+class CompletionTrie:
+    """Immutable trie; ``complete`` returns ``(text, lemma, count)`` tuples."""
+
+    def __init__(self, entries, keep=MAX_COMPLETIONS):
+        """``entries`` yields ``(text, lemma, count, keys)``."""
+        ranked = {}
+        for text, lemma, count, keys in entries:
+            entry = (text, lemma)
+            previous = ranked.get(entry)
+            if previous is None or count > previous[0]:
+                ranked[entry] = (count, set(keys) | (previous[1] if previous else set()))
+            else:
+                previous[1].update(keys)
+
+        root = ({}, [])
+        for (text, lemma), (count, keys) in ranked.items():
+            item = (-count, text, lemma)
+            for key in {completion_key(k) for k in keys if k}:
+                node = root
+                node[1].append(item)
+                for char in key:
+                    node = node[0].setdefault(char, ({}, []))
+                    node[1].append(item)
+
+        # Keep only each node's best completions, deduplicated
+        stack = [root]
+        while stack:
+            children, items = stack.pop()
+            items[:] = sorted(set(items))[:keep]
+            stack.extend(children.values())
+
+        self._root = root
+        self.keep = keep
+        self.size = len(ranked)
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def from_session(cls, session):
+        """One entry per lemma and per (form, lemma), counted over all rows."""
+        lemmas = {}
+        forms = {}
+        columns = [LemmaData.lemma, LemmaData.form] + [
+            getattr(LemmaData, c) for c in LEMMA_KEYS + FORM_KEYS
+        ]
+        for lemma, form, *values in session.query(*columns):
+            for tally, text, keys in (
+                (lemmas, lemma, values[:len(LEMMA_KEYS)]),
+                (forms, form, values[len(LEMMA_KEYS):]),
+            ):
+                if not text:
+                    continue
+                count, seen_keys = tally.get((text, lemma), (0, set()))
+                seen_keys.update(keys)
+                tally[(text, lemma)] = (count + 1, seen_keys)
+        return cls(
+            (text, lemma, count, keys)
+            for tally in (lemmas, forms)
+            for (text, lemma), (count, keys) in tally.items()
+        )
+
+    def complete(self, prefix, limit=DEFAULT_COMPLETIONS):
+        node = self._root
+        for char in completion_key(prefix):
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return [(text, lemma, -neg_count) for neg_count, text, lemma in node[1][:limit]]
+
+
+def _build_completion_index():
+    index = CompletionTrie.from_session(db.session)
+    logger.info(f"Built completion trie over {len(index)} entries")
+    return index
+
+
+corpus.register(INDEX_NAME, _build_completion_index)
+
+
+def get_completion_index():
+    return corpus.get(INDEX_NAME)
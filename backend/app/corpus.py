@@ -0,0 +1,101 @@
+"""Corpus content version and the read-only structures derived from it.
+
+``antigone.db`` does not change while the app runs, so anything computed from
+it (search indexes, caches of rendered responses) can be built once and shared
+between requests. Each structure is registered under a name with a builder;
+``get`` builds it on first use and rebuilds it only if the content version
+has changed since.
+"""
+import hashlib
+import logging
+import threading
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import FullText, LemmaData, LemmaDefinition
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_KEY = 'corpus'
+
+VERSIONED_MODELS = (FullText, LemmaData, LemmaDefinition)
+
+_builders = {}
+_lazy = set()
+_lock = threading.RLock()
+
+
+def register(name, builder, eager=True):
+    """Register a zero-argument builder (run inside an app context) for ``name``.
+
+    ``eager=False`` structures are skipped at startup and built on first use.
+    """
+    _builders[name] = builder
+    if not eager:
+        _lazy.add(name)
+
+
+def compute_content_version(session):
+    """Hash every row of the corpus tables in primary-key order."""
+    digest = hashlib.sha256()
+    for model in VERSIONED_MODELS:
+        table = model.__table__
+        digest.update(table.name.encode())
+        rows = session.query(*table.columns).order_by(*table.primary_key.columns)
+        for row in rows:
+            digest.update(repr(tuple(row)).encode())
+    return digest.hexdigest()[:16]
+
+
+def init_app(app):
+    """Attach corpus state to the app; compute and warm it eagerly outside of tests."""
+    app.extensions[EXTENSION_KEY] = {'version': None, 'built': {}}
+    if app.config.get('CORPUS_EAGER', not app.testing):
+        with app.app_context():
+            try:
+                get_content_version()
+                for name in _builders:
+                    if name not in _lazy:
+                        get(name)
+            except SQLAlchemyError as e:
+                logger.warning(f"Corpus structures not built at startup: {str(e)}")
+
+
+def _state():
+    return current_app.extensions[EXTENSION_KEY]
+
+
+def get_content_version():
+    """Content version of the database, computed once per app."""
+    state = _state()
+    if state['version'] is None:
+        with _lock:
+            if state['version'] is None:
+                state['version'] = compute_content_version(db.session)
+                logger.info(f"Corpus content version {state['version']}")
+    return state['version']
+
+
+def refresh_content_version():
+    """Recompute the version; derived structures rebuild on their next ``get``."""
+    state = _state()
+    with _lock:
+        state['version'] = compute_content_version(db.session)
+    return state['version']
+
+
+def get(name):
+    """Return the structure registered as ``name`` for the current content version."""
+    version = get_content_version()
+    built = _state()['built']
+    entry = built.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    with _lock:
+        entry = built.get(name)
+        if entry is None or entry[0] != version:
+            entry = (version, _builders[name]())
+            built[name] = entry
+    return entry[1]
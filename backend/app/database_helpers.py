@@ -1,20 +1,28 @@
-from sqlalchemy import or_, and_, case, func
-from app import db
-from app.models import FullText, LemmaData, LemmaDefinition
-from app.utils import clean_word, strip_accents, parse_postag
+from app.definition_index import get_definition_index
+from app.models import LemmaData, LemmaDefinition
+from app.fuzzy_index import get_fuzzy_index
+from app.line_store import get_line_store
+from app.morphology_index import get_morphology_index
+from app.postag_table import get_postag_table
+from app.query_planner import BETA_CODE, BETA_CODE_MARKERS, classify_script, plan_query
+from app.corpus import get_content_version
+from app.refinement import get_refinement_cache, new_token
+from app.search_index import MAX_RESULTS, can_refine, get_lexicon_index, get_speaker_lines
+from app.normalization import clean_word, normalize_query, strip_accents
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Line numbers listed per lemma in grouped search results
+GROUP_LINE_NUMBERS = 10
+
 def get_line(line_num):
-    """Get a single line using SQLAlchemy"""
-    line = db.session.get(FullText, line_num)
-    return (line.line_text, line.speaker) if line else (None, None)
+    """Get a single line (text, speaker) from the line store"""
+    return get_line_store().line(line_num)
 
 def get_speaker(line_num):
     """Get speaker for a line"""
-    line = db.session.get(FullText, line_num)
-    return line.speaker if line else None
+    return get_line_store().speaker(line_num)
 
 def get_word_defs(lemma_id):
     """Get definitions for a lemma"""
@@ -37,12 +45,42 @@ def add_defs(data, definitions):
     return data
 
 
-def _word_details_from_lemmas(lemmas):
-    """Turn LemmaData ORM rows into the API payload shape."""
+def get_speakers(line_numbers):
+    """Map line_number -> speaker for many lines, from the line store."""
+    return get_line_store().speakers(line_numbers)
+
+def get_defs_for_lemmas(lemma_ids):
+    """Map lemma_id -> definition dicts (same shape as get_word_defs) in one query."""
+    lemma_ids = set(lemma_ids)
+    if not lemma_ids:
+        return {}
+    defs = LemmaDefinition.query.filter(
+        LemmaDefinition.lemma_id.in_(lemma_ids)
+    ).order_by(LemmaDefinition.lemma_id, LemmaDefinition.def_num).all()
+    by_lemma = {}
+    for d in defs:
+        by_lemma.setdefault(d.lemma_id, []).append({
+            'def_num': d.def_num,
+            'short_def': d.short_definition,
+            'queries': d.queries
+        })
+    return by_lemma
+
+
+def word_details_payload(lemmas):
+    """Turn lemma rows into the API payload shape.
+
+    Speakers and definitions for the whole result set are fetched up front in
+    two set-based queries and postags come decoded from the postag table,
+    then each entry is assembled in memory.
+    """
+    speakers = get_speakers(lemma.line_number for lemma in lemmas)
+    defs_by_lemma = get_defs_for_lemmas(lemma.lemma_id for lemma in lemmas)
+    cases = get_postag_table().decode_many(lemma.postag for lemma in lemmas)
+
     word_details = []
-    for lemma in lemmas:
-        speaker = get_speaker(lemma.line_number)
-        definitions = get_word_defs(lemma.lemma_id)
+    for lemma, case in zip(lemmas, cases):
+        definitions = defs_by_lemma.get(lemma.lemma_id)
 
         word_data = [{
             'lemma_id': lemma.lemma_id,
@@ -50,8 +88,8 @@ def _word_details_from_lemmas(lemmas):
             'form': lemma.form,
             'line_number': lemma.line_number,
             'postag': lemma.postag,
-            'speaker': speaker,
-        }, {'case': parse_postag(lemma.postag)}]
+            'speaker': speakers.get(lemma.line_number),
+        }, {'case': case}]
 
         if definitions:
             word_data = add_defs(word_data, definitions)
@@ -61,159 +99,218 @@ def _word_details_from_lemmas(lemmas):
     return word_details
 
 
-def _lookup_word_details_short_query(cleaned, normalized):
+def normalized_payload(rows):
+    """Normalized form of the word-details payload.
+
+    Each lemma's definitions, each distinct postag's decoded features and each
+    line's speaker are listed once; ``occurrences`` holds one compact
+    ``[lemma_id, line_number, form, postag]`` entry per row, in result order.
     """
-    Queries of length 1–2: return exact matches first, then prefix matches, then substring.
-    Avoids flooding results with weak `contains` hits before strong ties (e.g. single letter 'o').
+    speakers = get_speakers(row.line_number for row in rows)
+    defs_by_lemma = get_defs_for_lemmas(row.lemma_id for row in rows)
+    postag_table = get_postag_table()
+
+    lemmas = {}
+    postags = {}
+    occurrences = []
+    for row in rows:
+        if row.lemma_id not in lemmas:
+            lemmas[row.lemma_id] = {
+                'lemma': row.lemma,
+                'definitions': defs_by_lemma.get(row.lemma_id, []),
+            }
+        if row.postag not in postags:
+            postags[row.postag] = postag_table.decode(row.postag)
+        occurrences.append([row.lemma_id, row.line_number, row.form, row.postag])
+
+    return {
+        'lemmas': lemmas,
+        'postags': postags,
+        'speakers': {line: speakers.get(line) for _, line, _, _ in occurrences},
+        'occurrences': occurrences,
+    }
+
+
+def _search_scope(speaker=None, morphology=None):
+    """``(line_numbers, allowed)`` restricting a search, or None if nothing can match.
+
+    A morphology filter is answered by the bitmap index with the speaker
+    folded into the same intersection; otherwise the speaker's line set is
+    used.
     """
-    seen = set()
-    ordered_rows = []
-
-    def take_unique(query):
-        for row in query.limit(500).all():
-            key = (row.lemma_id, row.line_number)
-            if key not in seen:
-                seen.add(key)
-                ordered_rows.append(row)
-
-    exact_filter = or_(
-        LemmaData.form == cleaned,
-        LemmaData.lemma == cleaned,
-        LemmaData.normalized == normalized,
-        LemmaData.norm_form == normalized,
-        LemmaData.form_eng == cleaned,
-        LemmaData.norm_form_eng == normalized,
-        LemmaData.eng_lemma == cleaned,
-        LemmaData.eng_lemma == normalized,
-    )
-    q_exact = LemmaData.query.filter(exact_filter).order_by(
-        func.length(LemmaData.form).asc(),
-        LemmaData.line_number.asc(),
-    )
-    take_unique(q_exact)
-
-    prefix_filter = or_(
-        LemmaData.norm_form.startswith(normalized),
-        LemmaData.normalized.startswith(normalized),
-        LemmaData.form_eng.startswith(cleaned),
-        LemmaData.norm_form_eng.startswith(normalized),
-        LemmaData.full_eng.startswith(cleaned),
-        LemmaData.eng_lemma.startswith(normalized),
-    )
-    q_prefix = LemmaData.query.filter(prefix_filter).order_by(
-        func.length(LemmaData.form).asc(),
-        LemmaData.line_number.asc(),
+    if morphology:
+        allowed = get_morphology_index().positions(morphology, speaker)
+        return (None, allowed) if allowed else None
+    if speaker:
+        line_numbers = get_speaker_lines(speaker)
+        return (line_numbers, None) if line_numbers else None
+    return None, None
+
+
+def _word_query(word, speaker=None, morphology=None):
+    """(cleaned, normalized, line_numbers, allowed) for a word search, or None if it cannot match."""
+    if isinstance(word, str):
+        word = word.strip()
+    cleaned, normalized = normalize_query(word)
+
+    if not normalized:
+        return None
+
+    scope = _search_scope(speaker, morphology)
+    if scope is None:
+        return None
+    return (cleaned, normalized) + scope
+
+
+def find_word_rows(word, speaker=None, line_range=None, limit=MAX_RESULTS, morphology=None):
+    """Ranked lexicon rows for a word search, not yet hydrated.
+
+    With ``speaker``, only lines spoken by them are searched (case-insensitive).
+    With ``line_range`` (first, last), only those lines are searched and the
+    hits come back in line order. ``morphology`` ({feature: postag chars})
+    keeps only rows with matching postags. ``limit=None`` returns every hit.
+    """
+    query = _word_query(word, speaker, morphology)
+    if query is None:
+        return []
+    cleaned, normalized, line_numbers, allowed = query
+
+    index = get_lexicon_index()
+    if line_range:
+        first_line, last_line = line_range
+        return index.search_lines(
+            cleaned, normalized, first_line, last_line,
+            limit=limit, line_numbers=line_numbers, allowed=allowed,
+        )
+    return index.search(cleaned, normalized, limit=limit, line_numbers=line_numbers, allowed=allowed)
+
+
+def iter_word_row_tiers(word, speaker=None, limit=MAX_RESULTS, morphology=None):
+    """Yield ``(tier, rows)`` for an unscoped word search: exact, prefix, contains.
+
+    Each tier is ranked only when the previous one has been consumed, so the
+    strong hits can be sent before the substring tier is probed.
+    """
+    query = _word_query(word, speaker, morphology)
+    if query is None:
+        return
+    cleaned, normalized, line_numbers, allowed = query
+    yield from get_lexicon_index().search_tiers(
+        cleaned, normalized, limit=limit, line_numbers=line_numbers, allowed=allowed,
     )
-    take_unique(q_prefix)
-
-    contains_filter = or_(
-        LemmaData.form_eng.contains(cleaned),
-        LemmaData.norm_form_eng.contains(normalized),
-        LemmaData.full_eng.contains(cleaned),
-        LemmaData.eng_lemma.contains(normalized),
-        LemmaData.norm_form.contains(normalized),
-        LemmaData.normalized.contains(normalized),
+
+
+def refine_word_rows(word, token=None, speaker=None, limit=MAX_RESULTS, morphology=None):
+    """Incremental word search: ``(rows, token, refined)``.
+
+    ``token`` names the caller's typing session, which remembers the column
+    values that matched its previous query. When this query only narrows
+    that one, just those values are re-checked instead of probing the whole
+    lexicon. Either way the session is updated for the next keystroke and
+    comes back under the returned token.
+    """
+    token = token or new_token()
+    query = _word_query(word, speaker, morphology)
+    if query is None:
+        return [], token, False
+    cleaned, normalized, line_numbers, allowed = query
+    plan = plan_query(normalized)
+
+    store = get_refinement_cache()
+    version = get_content_version()
+    previous = store.get(token)
+    refined = (
+        previous is not None
+        and previous['version'] == version
+        and can_refine(previous['query'], (cleaned, normalized, plan))
     )
-    q_contains = LemmaData.query.filter(contains_filter).order_by(
-        func.length(LemmaData.form).asc(),
-        LemmaData.line_number.asc(),
+    index = get_lexicon_index()
+    keys = index.pattern_keys(
+        cleaned, normalized, plan, previous=previous['keys'] if refined else None,
     )
-    take_unique(q_contains)
+    store.put(token, {'version': version, 'query': (cleaned, normalized, plan), 'keys': keys})
 
-    return ordered_rows[:500]
+    rows = index.search(
+        cleaned, normalized, limit=limit, plan=plan, line_numbers=line_numbers,
+        pattern_keys=keys, allowed=allowed,
+    )
+    return rows, token, refined
 
 
-def lookup_word_details(word):
+def lookup_word_details(word, speaker=None, line_range=None):
     """Look up dictionary rows for a word search; exact matches rank above fuzzy matches."""
-    if isinstance(word, str):
-        word = word.strip()
-    cleaned = clean_word(word)
-    normalized = strip_accents(cleaned)
+    results = find_word_rows(word, speaker=speaker, line_range=line_range)
+
+    if not results:
+        return []
+
+    return word_details_payload(results)
+
+def suggest_words(word):
+    """"Did you mean" spellings for a word query, nearest edit distance first.
 
+    Beta Code diacritics are dropped first: the fuzzy index holds
+    unaccented forms.
+    """
+    normalized = strip_accents(clean_word(word.strip()))
+    if classify_script(normalized) == BETA_CODE:
+        normalized = ''.join(c for c in normalized if c not in BETA_CODE_MARKERS)
     if not normalized:
         return []
+    return [spelling for spelling, _, _ in get_fuzzy_index().lookup(normalized)]
 
-    if len(normalized) <= 2:
-        results = _lookup_word_details_short_query(cleaned, normalized)
-    else:
-        broad_filter = or_(
-            LemmaData.form == cleaned,
-            LemmaData.lemma == cleaned,
-            LemmaData.normalized == normalized,
-            LemmaData.norm_form == normalized,
-            LemmaData.norm_form.startswith(normalized),
-            LemmaData.normalized.startswith(normalized),
-            LemmaData.form_eng == cleaned,
-            LemmaData.norm_form_eng == normalized,
-            LemmaData.form_eng.startswith(cleaned),
-            LemmaData.norm_form_eng.startswith(normalized),
-            LemmaData.full_eng.startswith(cleaned),
-            LemmaData.eng_lemma.startswith(normalized),
-            LemmaData.eng_lemma == cleaned,
-            LemmaData.eng_lemma == normalized,
-            LemmaData.norm_form.contains(normalized),
-            LemmaData.normalized.contains(normalized),
-            LemmaData.form_eng.contains(cleaned),
-            LemmaData.norm_form_eng.contains(normalized),
-            LemmaData.full_eng.contains(cleaned),
-            LemmaData.eng_lemma.contains(normalized),
-        )
+def find_definition_rows(query, speaker=None, line_range=None, limit=MAX_RESULTS, morphology=None):
+    """Occurrences of the lemmas whose definitions best match ``query``.
 
-        query = LemmaData.query.filter(broad_filter).order_by(
-            case(
-                (LemmaData.form == cleaned, 1),
-                (LemmaData.lemma == cleaned, 2),
-                (LemmaData.normalized == normalized, 3),
-                (LemmaData.norm_form == normalized, 4),
-                (LemmaData.form_eng == cleaned, 5),
-                (LemmaData.norm_form_eng == normalized, 6),
-                (LemmaData.eng_lemma == normalized, 7),
-                (LemmaData.eng_lemma == cleaned, 8),
-                (LemmaData.norm_form.startswith(normalized), 11),
-                (LemmaData.normalized.startswith(normalized), 12),
-                (LemmaData.form_eng.startswith(cleaned), 13),
-                (LemmaData.norm_form_eng.startswith(normalized), 14),
-                (LemmaData.full_eng.startswith(cleaned), 15),
-                (LemmaData.eng_lemma.startswith(normalized), 16),
-                (LemmaData.norm_form.contains(normalized), 21),
-                (LemmaData.normalized.contains(normalized), 22),
-                (LemmaData.form_eng.contains(cleaned), 23),
-                (LemmaData.norm_form_eng.contains(normalized), 24),
-                (LemmaData.full_eng.contains(cleaned), 25),
-                (LemmaData.eng_lemma.contains(normalized), 26),
-                else_=99,
-            ),
-            func.length(LemmaData.form).asc(),
-            LemmaData.line_number.asc(),
-        ).limit(500)
-
-        results = query.all()
+    The matching lemma set is resolved once from the definition index (best
+    first) and their occurrences are taken from the lexicon index, lemma by
+    lemma in line order. ``limit=None`` returns every occurrence.
+    """
+    lemma_ids = [lemma_id for lemma_id, _ in get_definition_index().search(query)]
+    if not lemma_ids:
+        return []
 
-    if not results:
+    scope = _search_scope(speaker, morphology)
+    if scope is None:
         return []
+    line_numbers, allowed = scope
 
-    return _word_details_from_lemmas(results)
+    return get_lexicon_index().occurrences(
+        lemma_ids, limit=limit, line_numbers=line_numbers, line_range=line_range, allowed=allowed,
+    )
 
-def search_by_definition(query):
-    """Returns list of (lemma_id, line_number) tuples for matching definitions"""
-    exact_matches = db.session.query(
-        LemmaDefinition.lemma_id,
-        LemmaData.line_number
-    ).join(LemmaData).filter(
-        LemmaDefinition.short_definition == query
-    ).all()
-    
-    if exact_matches:
-        return exact_matches
-    
-    partial_matches = db.session.query(
-        LemmaDefinition.lemma_id,
-        LemmaData.line_number
-    ).join(LemmaData).filter(
-        LemmaDefinition.short_definition.contains(query)
-    ).limit(12).all()
-    
-    return partial_matches[:300]
+
+def find_morphology_rows(query=None, speaker=None, line_range=None, limit=MAX_RESULTS, morphology=None):
+    """Rows matching a morphology filter alone (no search term), in line order."""
+    if not morphology:
+        return []
+    _, allowed = _search_scope(speaker, morphology) or (None, ())
+    return get_lexicon_index().rows_at(allowed, limit=limit, line_range=line_range)
+
+
+def group_rows_by_lemma(rows):
+    """[(lemma_id, rows)] with lemmas in order of their first (best) row."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.lemma_id, []).append(row)
+    return list(groups.items())
+
+
+def lemma_groups_payload(groups, max_lines=GROUP_LINE_NUMBERS):
+    """One entry per lemma: occurrence count, first line numbers, forms and definitions."""
+    defs_by_lemma = get_defs_for_lemmas(lemma_id for lemma_id, _ in groups)
+    payload = []
+    for lemma_id, rows in groups:
+        line_numbers = sorted({row.line_number for row in rows})
+        payload.append({
+            'lemma_id': lemma_id,
+            'lemma': rows[0].lemma,
+            'count': len(rows),
+            'line_numbers': line_numbers[:max_lines],
+            'forms': list(dict.fromkeys(row.form for row in rows)),
+            'definitions': defs_by_lemma.get(lemma_id, []),
+        })
+    return payload
 
 def get_word(lemma_id):
     """Return one surface form for a lemma_id (lemma may appear on multiple lines)."""
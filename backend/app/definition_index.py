@@ -0,0 +1,151 @@
+"""Inverted index with BM25 ranking over English short definitions.
+
+Each lemma is one document: the concatenation of its ``short_definition``
+rows. Tokens are lowercased, split on anything that is not a letter or digit,
+and lightly stemmed so that "loves", "loved" and "love" share a posting list.
+Queries intersect the posting lists of their terms and fall back to the
+union when no lemma contains all of them.
+"""
+from collections import Counter
+import logging
+import math
+import re
+
+from app import corpus, db
+from app.models import LemmaData, LemmaDefinition
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'definition_index'
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_DEFINITION_RESULTS = 25
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into',
+    'is', 'it', 'of', 'on', 'or', 'one', 'the', 'to', 'with',
+})
+
+
+def stem(word):
+    """Light suffix stripping (plurals, -ed, -ing, final -e)."""
+    if len(word) <= 3:
+        return word
+    if word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith(('sses', 'ches', 'shes', 'xes', 'zes')):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    if word.endswith('ing') and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith('ed') and len(word) > 4:
+        word = word[:-2]
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz':
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Stemmed terms of ``text``; stopwords and single letters (e.g. the "s" of
+    "brother's") are dropped unless nothing else is left."""
+    words = _TOKEN.findall((text or '').lower())
+    content = [w for w in words if w not in STOPWORDS and len(w) > 1]
+    return [stem(w) for w in (content or words)]
+
+
+class DefinitionIndex:
+    """Immutable BM25 index; documents are lemma_ids."""
+
+    def __init__(self, definitions):
+        """``definitions`` yields ``(lemma_id, short_definition)`` rows."""
+        texts = {}
+        for lemma_id, short_definition in definitions:
+            if short_definition:
+                texts.setdefault(lemma_id, []).append(short_definition)
+
+        postings = {}
+        lengths = {}
+        exact = {}
+        for lemma_id, defs in texts.items():
+            terms = []
+            for short_definition in defs:
+                terms.extend(tokenize(short_definition))
+                exact.setdefault(short_definition.strip().casefold(), set()).add(lemma_id)
+            lengths[lemma_id] = len(terms)
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, {})[lemma_id] = tf
+
+        self._postings = postings
+        self._lengths = lengths
+        self._exact = {text: frozenset(ids) for text, ids in exact.items()}
+        self._avg_length = (sum(lengths.values()) / len(lengths)) if lengths else 0.0
+        self._idf = {
+            term: math.log(1 + (len(lengths) - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+
+    def __len__(self):
+        return len(self._lengths)
+
+    @classmethod
+    def from_session(cls, session):
+        """Index definitions of lemmas that occur in the text."""
+        in_text = session.query(LemmaData.lemma_id).distinct()
+        rows = session.query(
+            LemmaDefinition.lemma_id, LemmaDefinition.short_definition
+        ).filter(LemmaDefinition.lemma_id.in_(in_text)).all()
+        return cls(rows)
+
+    def _bm25(self, lemma_id, terms):
+        length_norm = 1 - BM25_B + BM25_B * self._lengths[lemma_id] / (self._avg_length or 1)
+        score = 0.0
+        for term in terms:
+            tf = self._postings[term].get(lemma_id, 0)
+            if tf:
+                score += self._idf[term] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        return score
+
+    def search(self, query, limit=MAX_DEFINITION_RESULTS):
+        """Return ``(lemma_id, score)`` pairs, best first.
+
+        Lemmas with a definition equal to the query (case-insensitive) come
+        first, then BM25 over lemmas containing every query term, or any of
+        them when none contains all.
+        """
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self._postings]
+        exact = self._exact.get((query or '').strip().casefold(), frozenset())
+
+        candidates = set()
+        if terms:
+            ordered = sorted(terms, key=lambda t: len(self._postings[t]))
+            candidates = set(self._postings[ordered[0]])
+            for term in ordered[1:]:
+                candidates &= self._postings[term].keys()
+                if not candidates:
+                    break
+            if not candidates:
+                candidates = set().union(*(self._postings[t] for t in terms))
+
+        scored = [(lemma_id, self._bm25(lemma_id, terms)) for lemma_id in candidates | exact]
+        scored.sort(key=lambda pair: (pair[0] not in exact, -pair[1], pair[0]))
+        return scored[:limit]
+
+
+def _build_definition_index():
+    index = DefinitionIndex.from_session(db.session)
+    logger.info(f"Built definition index over {len(index)} lemmas")
+    return index
+
+
+corpus.register(INDEX_NAME, _build_definition_index)
+
+
+def get_definition_index():
+    return corpus.get(INDEX_NAME)
@@ -0,0 +1,134 @@
+"""Typo-tolerant term lookup (SymSpell-style deletion index).
+
+Every distinct ``normalized``, ``norm_form`` and ``eng_lemma`` value is stored
+with all strings reachable from it by deleting up to ``MAX_DISTANCE``
+characters. A query is expanded the same way, so candidates within the edit
+distance are found by dictionary lookups; only those few candidates are
+verified with a bounded Levenshtein distance.
+"""
+import logging
+
+from sqlalchemy import func
+
+from app import corpus, db
+from app.models import LemmaData
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'fuzzy_index'
+
+FUZZY_COLUMNS = ('normalized', 'norm_form', 'eng_lemma')
+
+MAX_DISTANCE = 2
+MAX_SUGGESTIONS = 5
+# Queries up to this length only tolerate one edit; two edits on a short
+# word match too much unrelated vocabulary.
+SHORT_QUERY_LENGTH = 4
+
+
+def fuzzy_key(term):
+    """Case-insensitive key; casefold also merges final and medial sigma."""
+    return term.casefold()
+
+
+def _deletes(term, max_distance):
+    """All distinct strings obtained by deleting up to ``max_distance`` chars."""
+    out = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def edit_distance(a, b, max_distance):
+    """Levenshtein distance, or ``max_distance + 1`` once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """Immutable deletion index over corpus terms and their frequencies."""
+
+    def __init__(self, term_counts, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        counts = {}
+        spellings = {}
+        for term, count in term_counts:
+            if not term:
+                continue
+            key = fuzzy_key(term)
+            counts[key] = counts.get(key, 0) + count
+            spellings.setdefault(key, term)
+        self._counts = counts
+        self._spellings = spellings
+
+        deletes = {}
+        for key in counts:
+            for variant in _deletes(key, max_distance):
+                deletes.setdefault(variant, []).append(key)
+        self._deletes = {variant: tuple(keys) for variant, keys in deletes.items()}
+
+    def __len__(self):
+        return len(self._counts)
+
+    @classmethod
+    def from_session(cls, session):
+        term_counts = []
+        for name in FUZZY_COLUMNS:
+            col = getattr(LemmaData, name)
+            term_counts.extend(session.query(col, func.count()).group_by(col).all())
+        return cls(term_counts)
+
+    def lookup(self, term, max_distance=None, limit=MAX_SUGGESTIONS):
+        """Return ``(spelling, distance, count)`` for the nearest terms.
+
+        Distances are tried in increasing order and the search stops at the
+        first one with any match (distance 0 means a case or final-sigma
+        difference only). Matches are ordered by corpus frequency, then
+        spelling.
+        """
+        key = fuzzy_key(term)
+        if max_distance is None:
+            max_distance = 1 if len(key) <= SHORT_QUERY_LENGTH else self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+
+        distances = {}
+        for distance in range(max_distance + 1):
+            matched = set()
+            for variant in _deletes(key, distance):
+                for candidate in self._deletes.get(variant, ()):
+                    if candidate not in distances:
+                        distances[candidate] = edit_distance(key, candidate, max_distance)
+                    if distances[candidate] <= distance:
+                        matched.add(candidate)
+            if matched:
+                found = sorted((-self._counts[c], self._spellings[c]) for c in matched)
+                return [(spelling, distance, -neg_count) for neg_count, spelling in found[:limit]]
+        return []
+
+
+def _build_fuzzy_index():
+    index = FuzzyIndex.from_session(db.session)
+    logger.info(f"Built fuzzy index over {len(index)} terms")
+    return index
+
+
+corpus.register(INDEX_NAME, _build_fuzzy_index)
+
+
+def get_fuzzy_index():
+    return corpus.get(INDEX_NAME)
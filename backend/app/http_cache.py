@@ -0,0 +1,128 @@
+"""Conditional GETs and Cache-Control for the read-only API.
+
+A read-only response depends on the request URL, the corpus content version
+and the code serving it, so its strong ETag is a hash of the URL, the content
+version, API_VERSION and a build identifier, and can be computed before the
+view runs. A matching ``If-None-Match`` is answered with 304 without running
+queries or serializing anything. The build identifier is ``BUILD_ID`` from
+the app config, or else a hash of the ``app`` package sources taken at
+startup, so a deploy that changes response bodies also changes their tags.
+
+Cache-Control is chosen per endpoint. ``CACHE_CONTROL`` in the app config
+maps endpoint names (e.g. ``"api.get_page"``) to header values and overrides
+DEFAULT_CACHE_CONTROL.
+"""
+import functools
+import hashlib
+from http import HTTPStatus
+from pathlib import Path
+
+from flask import current_app, request
+
+from app.corpus import get_content_version
+from app.utils import API_VERSION
+
+EXTENSION_KEY = 'http_cache'
+
+# Text and metadata only change with a new database or deploy (and the ETag
+# changes with them); search-style responses are kept shorter in shared caches.
+DEFAULT_CACHE_CONTROL = {
+    'api.get_page': 'public, max-age=86400',
+    'api.get_lines': 'public, max-age=86400',
+    'api.get_all_speakers': 'public, max-age=86400',
+    'api.get_metadata': 'public, max-age=86400',
+    'api.get_postags': 'public, max-age=86400',
+    'api.get_pages': 'public, max-age=86400',
+    'api.get_line_set': 'public, max-age=86400',
+    'api.get_bundle_snapshot': 'public, max-age=86400',
+    'api.get_bundle_delta': 'public, max-age=86400',
+}
+FALLBACK_CACHE_CONTROL = 'public, max-age=3600'
+
+# Encodings a view may negotiate; each is its own representation with its own tag
+ENCODINGS = ('gzip', 'br')
+
+
+def source_hash():
+    """Hash of the ``app`` package's Python sources, standing in for a release id."""
+    package = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(package.rglob('*.py')):
+        digest.update(path.relative_to(package).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def init_app(app):
+    app.extensions[EXTENSION_KEY] = {'build': app.config.get('BUILD_ID') or source_hash()}
+
+
+def build_id():
+    return current_app.extensions[EXTENSION_KEY]['build']
+
+
+def no_store(response):
+    """Mark ``response`` as never cacheable; ``conditional`` then adds no validator.
+
+    For 200 responses that do not stand for the resource, e.g. the empty
+    result a search answers errors with, or a stream that may end in an error.
+    """
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def cache_control(endpoint):
+    policies = current_app.config.get('CACHE_CONTROL') or {}
+    if endpoint in policies:
+        return policies[endpoint]
+    return DEFAULT_CACHE_CONTROL.get(endpoint, FALLBACK_CACHE_CONTROL)
+
+
+def request_etag():
+    """Strong ETag (unquoted) of the identity response to the current request."""
+    seed = f"{get_content_version()}:{API_VERSION}:{build_id()}:{request.full_path}"
+    return hashlib.sha256(seed.encode()).hexdigest()[:32]
+
+
+def conditional(view=None, weak=False):
+    """Add ETag / Cache-Control to 200 responses of ``view`` and answer 304 for a matching If-None-Match.
+
+    A response the view marks ``no-store`` is passed through untouched. Use
+    ``@conditional(weak=True)`` for views whose body is equivalent but not
+    byte-identical between runs (e.g. it carries timings).
+    """
+    if view is None:
+        return functools.partial(conditional, weak=weak)
+
+    def matches(tag):
+        if weak:
+            return request.if_none_match.contains_weak(tag)
+        return request.if_none_match.contains(tag)
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = request_etag()
+        policy = cache_control(request.endpoint)
+
+        tags = [(etag, None)] + [
+            (f"{etag}-{encoding}", encoding) for encoding in ENCODINGS
+            if request.accept_encodings.quality(encoding) > 0
+        ]
+        for tag, encoding in tags:
+            if matches(tag):
+                response = current_app.response_class(status=HTTPStatus.NOT_MODIFIED)
+                response.set_etag(tag, weak=weak)
+                response.headers['Cache-Control'] = policy
+                if encoding:
+                    response.vary.add('Accept-Encoding')
+                return response
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code != HTTPStatus.OK or 'no-store' in response.headers.get('Cache-Control', ''):
+            return response
+        encoding = response.headers.get('Content-Encoding')
+        response.set_etag(f"{etag}-{encoding}" if encoding else etag, weak=weak)
+        response.headers.setdefault('Cache-Control', policy)
+        return response
+
+    return wrapper
@@ -0,0 +1,99 @@
+"""The text of the play, held in memory and indexed by line number.
+
+The play is about 1,250 lines, so ``/lines``, ``/read`` and the speaker
+lookups made while hydrating search results are served from three lists
+(text, speaker, casefolded speaker) indexed by line number rather than one
+ORM round trip per line. The store is rebuilt when the corpus content
+version changes.
+"""
+import logging
+
+from app import corpus, db
+from app.models import FullText
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'line_store'
+
+
+class LineStore:
+    """Immutable line number -> (text, speaker) arrays."""
+
+    def __init__(self, rows):
+        """``rows`` are (line_number, line_text, speaker) tuples."""
+        rows = list(rows)
+        size = max((line for line, _, _ in rows), default=0) + 1
+        self._present = [False] * size
+        self._texts = [None] * size
+        self._speakers = [None] * size
+        self._speaker_keys = [None] * size
+        for line, text, speaker in rows:
+            self._present[line] = True
+            self._texts[line] = text
+            self._speakers[line] = speaker
+            self._speaker_keys[line] = speaker.casefold() if speaker else None
+        self._count = len(rows)
+
+    def __len__(self):
+        return self._count
+
+    @classmethod
+    def from_session(cls, session):
+        return cls(session.query(FullText.line_number, FullText.line_text, FullText.speaker))
+
+    def __contains__(self, line):
+        return 0 <= line < len(self._present) and self._present[line]
+
+    def line(self, line):
+        """(text, speaker) of ``line``; (None, None) if it is not in the database."""
+        if line not in self:
+            return None, None
+        return self._texts[line], self._speakers[line]
+
+    def speaker(self, line):
+        return self._speakers[line] if line in self else None
+
+    def speakers(self, lines):
+        """Map line -> speaker for the given lines that are in the database."""
+        return {line: self._speakers[line] for line in set(lines) if line in self}
+
+    def rows(self, first, last, speaker=None, missing=False):
+        """(line, text, speaker) for ``first``..``last`` in order.
+
+        Lines not in the database are skipped, or given as (line, None, None)
+        with ``missing``. A ``speaker`` (case-insensitive) keeps only that
+        speaker's lines.
+        """
+        first = max(first, 0)
+        stop = max(last + 1, first)
+        bound = min(stop, len(self._present))
+        present = self._present[first:bound]
+        texts = self._texts[first:bound]
+        speakers = self._speakers[first:bound]
+        keys = self._speaker_keys[first:bound]
+        wanted = speaker.casefold() if speaker else None
+
+        found = []
+        for offset, line in enumerate(range(first, bound)):
+            if wanted is not None and keys[offset] != wanted:
+                continue
+            if present[offset]:
+                found.append((line, texts[offset], speakers[offset]))
+            elif missing:
+                found.append((line, None, None))
+        if missing and wanted is None:
+            found.extend((line, None, None) for line in range(bound, stop))
+        return found
+
+
+def _build_line_store():
+    store = LineStore.from_session(db.session)
+    logger.info(f"Loaded {len(store)} lines into the line store")
+    return store
+
+
+corpus.register(INDEX_NAME, _build_line_store)
+
+
+def get_line_store():
+    return corpus.get(INDEX_NAME)
@@ -0,0 +1,156 @@
+"""Bitmap indexes over postag features and speakers.
+
+Bit ``i`` of every bitmap stands for row position ``i`` of the lexicon index.
+There is one bitmap per (postag position, value) and one per speaker, held as
+Python ints so that combining constraints is a handful of C-level ``&`` and
+``|`` operations, however many rows match.
+"""
+import logging
+
+from app import corpus, db
+from app.models import FullText
+from app.search_index import get_lexicon_index
+from app.utils import POSTAG_FEATURES, POSTAG_FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'morphology_index'
+
+
+def parse_feature_values(feature, raw):
+    """Postag characters for a comma-separated filter value.
+
+    Each item is a postag letter ("g"), a decoded value ("genitive") or an
+    unambiguous prefix of one ("gen"), case-insensitive. Raises ValueError
+    for anything else.
+    """
+    values = dict(POSTAG_FEATURES)[feature]
+    chars = set()
+    for item in raw.split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item in values:
+            chars.add(item)
+            continue
+        found = [char for char, name in values.items() if name.startswith(item)]
+        if len(found) != 1:
+            raise ValueError(f"Unknown {feature} value: {item!r}")
+        chars.add(found[0])
+    if not chars:
+        raise ValueError(f"Empty {feature} filter")
+    return frozenset(chars)
+
+
+def parse_morphology(args):
+    """{feature: chars} from a mapping of query args; None when no feature is given."""
+    morphology = {
+        feature: parse_feature_values(feature, args[feature])
+        for feature in POSTAG_FEATURE_NAMES
+        if args.get(feature, '').strip()
+    }
+    return morphology or None
+
+
+def _bitmap(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for pos in positions:
+        bits[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmap_positions(bitmap):
+    """Frozen set of the positions of the set bits of ``bitmap``."""
+    bits = bin(bitmap)[:1:-1]
+    found = []
+    pos = bits.find('1')
+    while pos != -1:
+        found.append(pos)
+        pos = bits.find('1', pos + 1)
+    return frozenset(found)
+
+
+class MorphologyIndex:
+    """Immutable bitmaps over the rows of one lexicon index."""
+
+    def __init__(self, rows, speaker_of_line):
+        """``rows`` in lexicon index order; ``speaker_of_line`` maps line -> speaker."""
+        self.size = len(rows)
+        features = [{} for _ in POSTAG_FEATURES]
+        speakers = {}
+        for pos, row in enumerate(rows):
+            for i, char in enumerate((row.postag or '')[:len(POSTAG_FEATURES)]):
+                features[i].setdefault(char, []).append(pos)
+            speaker = speaker_of_line.get(row.line_number)
+            if speaker:
+                speakers.setdefault(speaker.casefold(), []).append(pos)
+
+        self._features = {
+            name: {char: _bitmap(positions, self.size) for char, positions in values.items()}
+            for name, values in zip(POSTAG_FEATURE_NAMES, features)
+        }
+        self._counts = {
+            name: {char: len(positions) for char, positions in values.items()}
+            for name, values in zip(POSTAG_FEATURE_NAMES, features)
+        }
+        self._speakers = {
+            speaker: _bitmap(positions, self.size) for speaker, positions in speakers.items()
+        }
+        self._speaker_counts = {speaker: len(positions) for speaker, positions in speakers.items()}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def all_rows(self):
+        return (1 << self.size) - 1
+
+    def feature_bitmap(self, feature, chars):
+        """Rows whose postag has any of ``chars`` at ``feature``'s position."""
+        bitmaps = self._features[feature]
+        union = 0
+        for char in chars:
+            union |= bitmaps.get(char, 0)
+        return union
+
+    def speaker_bitmap(self, speaker):
+        return self._speakers.get(speaker.casefold(), 0)
+
+    def select(self, morphology, speaker=None):
+        """Bitmap of the rows matching every feature (any of its values) and the speaker."""
+        selected = self.all_rows
+        for feature, chars in sorted(
+            morphology.items(), key=lambda item: self.count(*item),
+        ):
+            selected &= self.feature_bitmap(feature, chars)
+            if not selected:
+                return 0
+        if speaker:
+            selected &= self.speaker_bitmap(speaker)
+        return selected
+
+    def count(self, feature, chars):
+        """Rows a feature constraint keeps; the most selective one is applied first."""
+        counts = self._counts[feature]
+        return sum(counts.get(char, 0) for char in chars)
+
+    def speaker_count(self, speaker):
+        return self._speaker_counts.get(speaker.casefold(), 0)
+
+    def positions(self, morphology, speaker=None):
+        """Frozen set of the row positions selected by ``select``."""
+        return bitmap_positions(self.select(morphology, speaker))
+
+
+def _build_morphology_index():
+    speaker_of_line = dict(db.session.query(FullText.line_number, FullText.speaker))
+    index = MorphologyIndex(get_lexicon_index().rows, speaker_of_line)
+    logger.info(f"Built morphology bitmaps over {len(index)} rows")
+    return index
+
+
+corpus.register(INDEX_NAME, _build_morphology_index)
+
+
+def get_morphology_index():
+    return corpus.get(INDEX_NAME)
@@ -0,0 +1,200 @@
+"""Shared text normalization: accent stripping, query cleaning and Beta Code.
+
+The app and the ingest scripts in ``database/raw_data`` both go through this
+module. Every per-character mapping is compiled once, at import, into a
+``str.translate`` table, so normalizing a word is a single C-level pass
+instead of a Python loop over its characters. The results are exactly those
+of the per-character loops these functions replace.
+
+Beta Code can also be read back into Greek (``beta_to_greek``), so exact
+lemma and form lookups typed as ``lo/gos`` also find ``λόγος``.
+"""
+import functools
+import logging
+import re
+from unicodedata import category, normalize
+
+logger = logging.getLogger(__name__)
+
+# Distinct queries whose (cleaned, normalized) forms are memoized
+QUERY_CACHE_SIZE = 4096
+
+# Greek -> Beta Code, as used for the *_eng columns (later duplicate keys win)
+GREEK_TO_BETA = {
+    'α': 'a', 'ἁ': 'a(', 'ἀ': 'a)', 'ἂ': 'a)\\', 'ἃ': 'a(\\', 'ἄ': 'a)/', 'ἅ': 'a(/', 'ἆ': 'a)=' , 'ἇ': 'a(=', 
+    'ά': 'a/', 'ὰ': 'a\\', 'ᾶ': 'a=', 'ᾳ': 'a|', 'ᾷ': 'a|=', 'ᾴ': 'a|/', 'ᾲ': 'a|\\', 'ᾱ': 'a=', 'ᾰ': 'a', 'ά':'a/',
+    'β': 'b', 'γ': 'g', 'δ': 'd', 
+    'ε': 'e', 'ἐ': 'e)', 'ἑ': 'e(', 'έ': 'e/', 'ὲ': 'e\\', 
+    'ἔ': 'e)/', 'ἕ': 'e(/', 'ἒ': 'e)\\', 'ἓ': 'e(\\', 
+    'ζ': 'z', 
+    'η': 'h', 'ἡ': 'h(', 'ἠ': 'h)', 'ἤ': 'h)/', 'ἥ': 'h(/', 'ἦ': 'h)=', 'ἧ': 'h(=',  
+    'ή': 'h/', 'ὴ': 'h\\', 'ῆ': 'h=', 'ῃ': 'h|', 'ῄ': 'h|/', 'ῂ': 'h|\\', 'ῇ': 'h|=',
+    'θ': 'q', 
+    'ι': 'i', 'ἰ': 'i)', 'ἱ': 'i(', 'ἲ': 'i)\\', 'ἳ': 'i(\\', 'ἴ': 'i)/', 'ἵ': 'i(/', 'ἶ': 'i)=', 'ἷ': 'i(=',  
+    'ί': 'i/', 'ὶ': 'i\\', 'ῖ': 'i=', 'ϊ': 'i+', 'ΐ': 'i+/', 'ῒ': 'i+\\', 'ῗ': 'i+=', 
+    'κ': 'k', 'λ': 'l', 'μ': 'm', 'ν': 'n',
+    'ξ': 'c', 
+    'ο': 'o', 'ὀ': 'o)', 'ὁ': 'o(', 'ὄ': 'o)/', 'ὅ': 'o(/', 'ὂ': 'o)\\', 'ὃ': 'o(\\',  
+    'ό': 'o/', 'ὸ': 'o\\', 
+    'π': 'p', 
+    'ρ': 'r', 'ῤ': 'r)', 'ῥ': 'r(', 
+    'σ': 's', 'ς': 's', 'τ': 't', 
+    'υ': 'u', 'ὐ': 'u)', 'ὑ': 'u(', 'ὒ': 'u)\\', 'ὓ': 'u(\\', 'ὔ': 'u)/', 'ὕ': 'u(/', 'ὖ': 'u)=', 'ὗ': 'u(=',  
+    'ύ': 'u/', 'ὺ': 'u\\', 'ῦ': 'u=', 'ϋ': 'u+', 'ΰ': 'u+/', 'ῢ': 'u+\\', 'ῧ': 'u+=', 
+    'φ': 'f', 'χ': 'x', 'ψ': 'Y', 
+    'ω': 'w', 'ὠ': 'w)', 'ὡ': 'w(', 'ὤ': 'w)/', 'ὥ': 'w(/', 'ὦ': 'w)=', 'ὧ': 'w(=', 'ώ': 'w/',
+    'ώ': 'w/', 'ὼ': 'w\\', 'ῶ': 'w=', 'ῳ': 'w|', 'ῴ': 'w|/', 'ῲ': 'w|\\', 'ῷ': 'w|=', 
+
+    # Capital letters 
+    'Α': 'A', 'Ἀ': 'A)', 'Ἁ': 'A(', 'Ἄ': 'A)/', 'Ἅ': 'A(/', 'Ἆ': 'A(=', 'Ἇ': 'A)=', 'Ά': 'A/', 'Ᾱ': 'A=', 'Ᾰ': 'A', 
+    'Β': 'B', 'Γ': 'G', 'Δ': 'D', 
+    'Ε': 'E', 'Ἐ': 'E)', 'Ἑ': 'E(', 'Ἔ': 'E)/', 'Ἕ': 'E(/', 'Ἒ': 'E)\\', 'Ἓ': 'E(\\', 'Έ': 'E/', 
+    'Ζ': 'Z', 
+    'Η': 'H', 'Ἠ': 'H)', 'Ἡ': 'H(', 'Ἤ': 'H)/', 'Ἥ': 'H(/', 'Ἦ': 'H)=', 'Ἧ': 'H(=', 'Ή': 'H/', 'ῌ': 'H|', 'Ή': 'H|/', 
+    'Θ': 'Q)', 
+    'Ι': 'I', 'Ἰ': 'I)', 'Ἱ': 'I(', 'Ἴ': 'I)/', 'Ἵ': 'I(/', 'Ἶ': 'I)=', 'Ἷ': 'I(=', 'Ί': 'I/', 'Ῑ': 'I=', 'Ῐ': 'I', 
+    'Κ': 'K', 'Λ': 'L', 'Μ': 'M', 'Ν': 'N', 
+    'Ξ': 'C', 
+    'Ο': 'O', 'Ὀ': 'O)', 'Ὁ': 'O(', 'Ὄ': 'O)/', 'Ὅ': 'O(/', 'Ό': 'O/', 
+    'Π': 'P', 
+    'Ρ': 'R', 'Ῥ': 'R(', 
+    'Σ': 'S', 'Τ': 'T', 
+    'Υ': 'U', 'Ὑ': 'U(', 'Ὕ': 'U(/', 'Ὓ': 'U(\\', 'Ὗ': 'U(=', 'Ύ': 'U/', 'Ῡ': 'U=', 'Ῠ': 'U', 
+    'Φ': 'F', 'Χ': 'X', 'Ψ': 'Y', 
+    'Ω': 'W', 'Ὠ': 'W)', 'Ὡ': 'W(', 'Ὤ': 'W)/', 'Ὥ': 'W(/', 'Ὦ': 'W)=', 'Ὧ': 'W(=', 'Ώ': 'W/', 'ῼ': 'W|', 'Ώ': 'W|/' 
+}
+
+
+# Code point ranges whose stripped form is precomputed: ASCII through the
+# combining diacritics, Greek and Coptic, and Greek Extended. Everything the
+# corpus and Greek keyboards produce lives there.
+_TABLE_RANGES = ((0x0000, 0x0370), (0x0370, 0x0400), (0x1F00, 0x2000))
+_OUTSIDE_TABLE = re.compile('[^\u0000-\u03FF\u1F00-\u1FFF]')
+
+
+def _strip_diacritics_slow(s):
+    return ''.join(c for c in normalize('NFD', s) if category(c) != 'Mn')
+
+
+def _diacritics_table():
+    table = {}
+    for first, last in _TABLE_RANGES:
+        for code in range(first, last):
+            char = chr(code)
+            stripped = _strip_diacritics_slow(char)
+            if stripped != char:
+                table[code] = stripped or None
+    return table
+
+
+_DIACRITICS = _diacritics_table()
+
+
+def strip_diacritics(s):
+    """``s`` decomposed (NFD) without its combining marks."""
+    if s.isascii():
+        return s
+    if _OUTSIDE_TABLE.search(s):
+        return _strip_diacritics_slow(s)
+    return s.translate(_DIACRITICS)
+
+
+def strip_accents(s):
+    """Search form of ``s``: no diacritics and no apostrophes."""
+    return strip_diacritics(s).replace("'", '')
+
+
+_BREATHING_MARKS = str.maketrans('', '', '\u0313\u02BC')
+_TRAILING_PUNCTUATION = re.compile(r'[\u00B7\u002C\u002E\u037E\u0387;\]]+$')
+
+
+def clean_word(word):
+    """Drop breathing marks, a leading '[' and trailing punctuation / ']'."""
+    word = word.translate(_BREATHING_MARKS)
+    if word.startswith('['):
+        word = word[1:]
+    return _TRAILING_PUNCTUATION.sub('', word)
+
+
+class _DropUnknown(dict):
+    """Translate table that deletes characters it has no entry for."""
+
+    def __missing__(self, code):
+        return None
+
+
+_TO_BETA = str.maketrans(GREEK_TO_BETA)
+_TO_BETA_STRICT = _DropUnknown(_TO_BETA)
+
+
+def grk_to_eng(word, drop_unknown=False):
+    """Beta Code transliteration of ``word``.
+
+    Characters without a Beta Code form are kept as they are, or dropped
+    with ``drop_unknown`` (what the ingest scripts store).
+    """
+    if drop_unknown:
+        return word.translate(_TO_BETA_STRICT)
+    if logger.isEnabledFor(logging.DEBUG):
+        unknown = {char for char in word if ord(char) not in _TO_BETA}
+        if unknown:
+            logger.debug(f"No Beta Code for {''.join(sorted(unknown))!r} in {word!r}")
+    return word.translate(_TO_BETA)
+
+
+# Diacritic and capital markers that only appear in Beta Code transliterations
+BETA_CODE_MARKERS = frozenset(')(/\\=|+*')
+
+
+def _beta_table():
+    table = {}
+    for greek, beta in GREEK_TO_BETA.items():
+        table.setdefault(beta, greek)
+    # Spellings the forward table never produces but users type
+    table.setdefault('Q', 'Θ')
+    table.setdefault('y', 'ψ')
+    return table
+
+
+_FROM_BETA = _beta_table()
+_BETA_TOKEN = re.compile('|'.join(
+    re.escape(beta) for beta in sorted(_FROM_BETA, key=len, reverse=True)
+))
+# Standard Beta Code capitals: "*)a" and "*a)" both mean the table's "A)"
+_BETA_CAPITAL = re.compile(r'\*([)(/\\=|+]*)([a-zA-Z])')
+_FINAL_SIGMA = re.compile(r'σ(?!\w)')
+
+
+def is_beta_code(text):
+    """True for ASCII text with at least one letter and one Beta Code marker."""
+    return (
+        text.isascii()
+        and any(c.isalpha() for c in text)
+        and any(c in BETA_CODE_MARKERS for c in text)
+    )
+
+
+def beta_to_greek(text):
+    """Greek for Beta Code ``text``, longest spelling first; other characters pass through."""
+    text = _BETA_CAPITAL.sub(lambda match: match.group(2).upper() + match.group(1), text)
+    greek = _BETA_TOKEN.sub(lambda match: _FROM_BETA[match.group()], text)
+    return normalize('NFC', _FINAL_SIGMA.sub('ς', greek))
+
+
+@functools.lru_cache(maxsize=QUERY_CACHE_SIZE)
+def normalize_query(word):
+    """(cleaned, normalized) forms of a query word, memoized.
+
+    Beta Code is left as typed: word searches match it against the
+    transliterated columns, which fold ASCII case ("kre/wn" finds Κρέων).
+    """
+    cleaned = clean_word(word)
+    return cleaned, strip_accents(cleaned)
+
+
+def query_spellings(word):
+    """``normalize_query`` forms of ``word`` and, for Beta Code, of the Greek it spells."""
+    forms = [normalize_query(word)]
+    if is_beta_code(forms[0][0]):
+        forms.append(normalize_query(beta_to_greek(forms[0][0])))
+    return forms
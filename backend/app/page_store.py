@@ -0,0 +1,111 @@
+"""Pre-rendered, precompressed ``/read/<page>`` responses.
+
+The reading view is a fixed set of LAST_PAGE pages, each of which can be
+filtered to one speaker. Every (page, speaker) body is rendered once per
+corpus content version into the exact bytes ``jsonify`` would produce,
+together with its gzip (and, when the ``brotli`` package is installed,
+brotli) encodings. Serving a page is then a dictionary lookup and a choice
+of encoding.
+"""
+import gzip
+import logging
+
+from flask import current_app
+
+from app import corpus
+from app.line_store import get_line_store
+from app.utils import FIRST_PAGE, LAST_PAGE, LINES_PER_PAGE
+
+try:
+    import brotli
+except ImportError:  # optional: pages are then offered as gzip and identity only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'page_store'
+
+
+def page_lines(page):
+    """(first, last) line numbers of a reading page."""
+    return (page - 1) * LINES_PER_PAGE + 1, page * LINES_PER_PAGE
+
+
+class RenderedBody:
+    """One JSON body and its compressed encodings."""
+
+    __slots__ = ('encodings',)
+
+    def __init__(self, body):
+        self.encodings = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(body, quality=11)
+        self.encodings[None] = body
+
+    @property
+    def body(self):
+        return self.encodings[None]
+
+    def negotiate(self, accept_encodings):
+        """(encoding, bytes) for the smallest encoding the client accepts; None is identity."""
+        encoding = min(
+            (e for e in self.encodings if e is None or accept_encodings.quality(e) > 0),
+            key=lambda e: len(self.encodings[e]),
+        )
+        return encoding, self.encodings[encoding]
+
+
+class PageStore:
+    """Immutable (page, speaker) -> RenderedBody table."""
+
+    def __init__(self, lines, render):
+        """``lines`` is a LineStore; ``render`` turns a payload into JSON bytes."""
+        shared = {}
+
+        def rendered(payload):
+            body = render(payload)
+            if body not in shared:
+                shared[body] = RenderedBody(body)
+            return shared[body]
+
+        self._pages = {}
+        self._empty = rendered([])
+        for page in range(FIRST_PAGE, LAST_PAGE + 1):
+            rows = lines.rows(*page_lines(page))
+            self._pages[page, None] = rendered(_payload(rows))
+            by_speaker = {}
+            for row in rows:
+                if row[2]:
+                    by_speaker.setdefault(row[2].casefold(), []).append(row)
+            for speaker, speaker_rows in by_speaker.items():
+                self._pages[page, speaker] = rendered(_payload(speaker_rows))
+        self.unique_bodies = len(shared)
+
+    def __len__(self):
+        return len(self._pages)
+
+    def page(self, page, speaker=None):
+        """Rendered body of ``page``, optionally only ``speaker``'s lines (case-insensitive)."""
+        key = (page, speaker.casefold() if speaker else None)
+        return self._pages.get(key, self._empty)
+
+
+def _payload(rows):
+    return [{
+        "lineNum": line_num,
+        "line_text": line_text,
+        "speaker": speaker
+    } for line_num, line_text, speaker in rows]
+
+
+def _build_page_store():
+    store = PageStore(get_line_store(), lambda payload: current_app.json.response(payload).get_data())
+    logger.info(f"Rendered {len(store)} reading pages ({store.unique_bodies} distinct bodies)")
+    return store
+
+
+corpus.register(INDEX_NAME, _build_page_store)
+
+
+def get_page_store():
+    return corpus.get(INDEX_NAME)
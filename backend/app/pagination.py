@@ -0,0 +1,45 @@
+"""Opaque cursors for paging through search results.
+
+A cursor records the offset of the next page and the corpus content version
+it was issued against, so a cursor from before a data change is rejected
+instead of silently skipping or repeating hits.
+"""
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(offset, version):
+    raw = json.dumps({'o': offset, 'v': version}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, version):
+    """Return the offset stored in ``cursor``; ValueError if it is malformed or stale."""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = data['o']
+        cursor_version = data['v']
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ValueError(f"Invalid cursor offset: {offset!r}")
+    if cursor_version != version:
+        raise ValueError("Cursor was issued for a different corpus version")
+    return offset
+
+
+def page_size(value):
+    """Parse a ``limit`` parameter; ValueError if it is not a positive integer."""
+    if value in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    size = int(value)
+    if size < 1:
+        raise ValueError(f"Invalid page size: {value!r}")
+    return min(size, MAX_PAGE_SIZE)
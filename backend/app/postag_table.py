@@ -0,0 +1,107 @@
+"""Precomputed postag decoding.
+
+The corpus uses a few hundred distinct postags, so each one is decoded once
+per corpus version into a read-only feature dict (the ``parse_postag``
+shape) and its serialized JSON. Hydrating search results is then a
+dictionary lookup per row. A tag with unknown feature letters decodes to {}
+instead of failing the whole table.
+"""
+import json
+import logging
+
+from flask import current_app
+
+from app import corpus, db
+from app.models import LemmaData
+from app.utils import parse_postag
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'postag_table'
+
+
+class FrozenFeatures(dict):
+    """A ``parse_postag`` result shared between responses; mutation raises TypeError."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("decoded postags are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenFeatures, (dict(self),))
+
+
+def _parse(tag):
+    try:
+        return FrozenFeatures(parse_postag(tag))
+    except KeyError:
+        logger.debug(f"Postag {tag!r} has unknown feature letters, decoded as {{}}")
+        return FrozenFeatures()
+
+
+def _compact_dumps(features):
+    return json.dumps(features, separators=(',', ':'), sort_keys=True)
+
+
+class PostagTable:
+    """Immutable tag -> decoded features table."""
+
+    def __init__(self, tags, dumps=None):
+        """``dumps`` serializes a feature dict; by default compact, sorted JSON."""
+        self._dumps = dumps or _compact_dumps
+        self._features = {}
+        self._json = {}
+        for tag in set(tags):
+            features = _parse(tag)
+            self._features[tag] = features
+            self._json[tag] = self._dumps(features)
+
+    def __len__(self):
+        return len(self._features)
+
+    def __iter__(self):
+        return iter(self._features)
+
+    def __contains__(self, tag):
+        return tag in self._features
+
+    @classmethod
+    def from_session(cls, session, dumps=None):
+        return cls((tag for tag, in session.query(LemmaData.postag).distinct()), dumps)
+
+    def decode(self, tag):
+        """Decoded features of ``tag``; tags outside the corpus are parsed on the fly,
+        and ones with unknown feature letters decode to {} like malformed tags."""
+        features = self._features.get(tag)
+        if features is None:
+            features = _parse(tag)
+        return features
+
+    def decode_many(self, tags):
+        """Decoded features for a column of tags, in order."""
+        table = self._features
+        return [table[tag] if tag in table else self.decode(tag) for tag in tags]
+
+    def json(self, tag):
+        """Serialized JSON object of ``decode(tag)``."""
+        fragment = self._json.get(tag)
+        if fragment is None:
+            fragment = self._dumps(self.decode(tag))
+        return fragment
+
+
+def _build_postag_table():
+    # Fragments are spliced into /postags bodies, so serialize them like the app does
+    table = PostagTable.from_session(
+        db.session, lambda features: current_app.json.dumps(features, separators=(',', ':')))
+    logger.info(f"Built postag table over {len(table)} tags")
+    return table
+
+
+corpus.register(INDEX_NAME, _build_postag_table)
+
+
+def get_postag_table():
+    return corpus.get(INDEX_NAME)
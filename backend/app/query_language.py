@@ -0,0 +1,238 @@
+"""Structured search queries, e.g. ``lemma:λόγος case:gen speaker:Κρέων lines:1-300``.
+
+A query is a list of ``field:value`` terms, all of which must hold; a bare
+term means ``word:term``. Values may be double-quoted to include spaces, and
+for the postag fields, ``lemma``, ``form`` and ``speaker`` commas separate
+alternatives.
+
+Each term compiles to a predicate over lexicon index rows with an estimate
+of how many rows it keeps. The most selective predicate is materialized from
+its index (exact postings, postag bitmaps, the line order, ...) and the
+remaining ones are checked against those candidates only, most selective
+first. The chosen order is returned with the rows, so latency can be
+explained.
+"""
+from collections import namedtuple
+import logging
+import re
+import time
+
+from app.definition_index import get_definition_index
+from app.morphology_index import bitmap_positions, get_morphology_index, parse_feature_values
+from app.query_planner import plan_query
+from app.search_index import get_lexicon_index, get_speaker_lines
+from app.normalization import normalize_query, query_spellings
+from app.utils import MAX_LINE, MIN_LINE, POSTAG_FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('word', 'lemma', 'form', 'def', 'speaker', 'lines') + POSTAG_FEATURE_NAMES
+
+# Exact-match columns probed for lemma: and form: terms ('cleaned' or 'normalized' needle)
+LEMMA_COLUMNS = (('lemma', 'cleaned'), ('normalized', 'normalized'), ('eng_lemma', 'cleaned'))
+FORM_COLUMNS = (
+    ('form', 'cleaned'), ('norm_form', 'normalized'),
+    ('form_eng', 'cleaned'), ('norm_form_eng', 'normalized'),
+)
+
+_TERM = re.compile(r'(?:(\w+):)?(?:"([^"]*)"|(\S+))')
+
+Term = namedtuple('Term', ['field', 'value'])
+
+
+def parse_query(text):
+    """List of Terms; ValueError for unknown fields, empty values or an empty query."""
+    terms = []
+    for match in _TERM.finditer(text or ''):
+        field = (match.group(1) or 'word').lower()
+        value = (match.group(2) if match.group(2) is not None else match.group(3)).strip()
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field: {field!r}")
+        if not value:
+            raise ValueError(f"Empty value for {field}")
+        terms.append(Term(field, value))
+    if not terms:
+        raise ValueError("Empty query")
+    return terms
+
+
+def _alternatives(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _line_span(value):
+    """(first, last) from "12" or "1-300", clamped to the play; ValueError otherwise."""
+    first, _, last = value.partition('-')
+    first = int(first)
+    last = int(last) if last else first
+    first, last = max(MIN_LINE, first), min(MAX_LINE, last)
+    if first > last:
+        raise ValueError(f"Empty line range: {value!r}")
+    return first, last
+
+
+class Predicate:
+    """One compiled term.
+
+    ``estimate`` is the number of rows it keeps (None when unknown until
+    probed), ``positions`` materializes them from an index and ``test``
+    checks a single row position. Postag and speaker terms also have a
+    ``bitmap`` over the rows (see ``app.morphology_index``).
+    """
+
+    def __init__(self, term, estimate, positions, test, bitmap=None):
+        self.term = term
+        self.estimate = estimate
+        self.positions = positions
+        self.test = test
+        self.bitmap = bitmap
+
+    @property
+    def label(self):
+        return f"{self.term.field}:{self.term.value}"
+
+    def filter(self, candidates):
+        test = self.test
+        return [pos for pos in candidates if test(pos)]
+
+
+def _exact_predicate(term, lexicon, columns):
+    found = set()
+    for item in _alternatives(term.value):
+        # Beta Code items are probed as typed and as the Greek they spell
+        for cleaned, normalized in query_spellings(item):
+            needles = {'cleaned': cleaned, 'normalized': normalized}
+            for col, needle in columns:
+                found.update(lexicon.exact_positions(col, needles[needle]))
+    found = frozenset(found)
+    return Predicate(term, len(found), lambda: found, found.__contains__)
+
+
+def compile_term(term, lexicon, morphology):
+    """Predicate for one Term; ValueError if its value is invalid."""
+    field, value = term
+    rows = lexicon.rows
+
+    if field in POSTAG_FEATURE_NAMES:
+        chars = parse_feature_values(field, value)
+        i = POSTAG_FEATURE_NAMES.index(field)
+        return Predicate(
+            term, morphology.count(field, chars),
+            lambda: morphology.positions({field: chars}),
+            lambda pos: (rows[pos].postag or '')[i:i + 1] in chars,
+            bitmap=lambda: morphology.feature_bitmap(field, chars),
+        )
+
+    if field == 'speaker':
+        speakers = _alternatives(value)
+        lines = frozenset().union(*(get_speaker_lines(s) for s in speakers))
+
+        def speaker_bitmap():
+            union = 0
+            for s in speakers:
+                union |= morphology.speaker_bitmap(s)
+            return union
+
+        return Predicate(
+            term, sum(morphology.speaker_count(s) for s in speakers),
+            lambda: bitmap_positions(speaker_bitmap()),
+            lambda pos: rows[pos].line_number in lines,
+            bitmap=speaker_bitmap,
+        )
+
+    if field == 'lines':
+        first, last = _line_span(value)
+        span = lexicon.line_positions(first, last)
+        return Predicate(
+            term, len(span), lambda: span,
+            lambda pos: first <= rows[pos].line_number <= last,
+        )
+
+    if field == 'lemma':
+        return _exact_predicate(term, lexicon, LEMMA_COLUMNS)
+
+    if field == 'form':
+        return _exact_predicate(term, lexicon, FORM_COLUMNS)
+
+    if field == 'def':
+        found = frozenset(
+            pos
+            for lemma_id, _ in get_definition_index().search(value)
+            for pos in lexicon.lemma_positions(lemma_id)
+        )
+        return Predicate(term, len(found), lambda: found, found.__contains__)
+
+    # word: the usual word search; its size is unknown until it is ranked
+    cleaned, normalized = normalize_query(value)
+    if not normalized:
+        raise ValueError(f"Empty value for {field}")
+    plan = plan_query(normalized)
+    return Predicate(
+        term, None,
+        lambda: lexicon.ranked_positions(
+            cleaned, normalized, plan, len(lexicon), coarse=len(normalized) <= 2,
+        ),
+        lexicon.word_matcher(cleaned, normalized, plan),
+    )
+
+
+def plan_predicates(predicates):
+    """Most selective first; predicates of unknown size go last."""
+    return sorted(predicates, key=lambda p: (p.estimate is None, p.estimate or 0))
+
+
+def run_query(text):
+    """Rows matching every term of ``text``, in line order, and the executed plan.
+
+    When the most selective predicate has a bitmap, every predicate with one
+    is applied as a single bitmap intersection ("bitmap") before any rows are
+    materialized. Otherwise the first predicate is materialized from its index
+    ("index") and the others filter its rows ("filter"). Once nothing is left
+    the remaining predicates are "skipped". The plan lists the predicates in
+    evaluation order with their strategy, estimate, the rows left after them
+    and their time.
+    """
+    lexicon = get_lexicon_index()
+    morphology = get_morphology_index()
+    predicates = plan_predicates([compile_term(t, lexicon, morphology) for t in parse_query(text)])
+
+    steps = []
+
+    def record(predicate, strategy, rows, start=None):
+        steps.append({
+            'predicate': predicate.label,
+            'strategy': strategy,
+            'estimate': predicate.estimate,
+            'rows': rows,
+            'micros': round((time.perf_counter() - start) * 1e6) if start is not None else 0,
+        })
+
+    candidates = None
+    if predicates[0].bitmap is not None:
+        selected = morphology.all_rows
+        for predicate in [p for p in predicates if p.bitmap is not None]:
+            if not selected:
+                record(predicate, 'skipped', 0)
+                continue
+            start = time.perf_counter()
+            selected &= predicate.bitmap()
+            record(predicate, 'bitmap', bin(selected).count('1'), start)
+        candidates = bitmap_positions(selected)
+        predicates = [p for p in predicates if p.bitmap is None]
+
+    for predicate in predicates:
+        if candidates is not None and not candidates:
+            record(predicate, 'skipped', 0)
+            continue
+        start = time.perf_counter()
+        if candidates is None:
+            candidates = predicate.positions()
+            strategy = 'index'
+        else:
+            candidates = predicate.filter(candidates)
+            strategy = 'filter'
+        record(predicate, strategy, len(candidates), start)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Query plan for {text!r}: {[step['predicate'] for step in steps]}")
+    return lexicon.rows_at(candidates, limit=None), steps
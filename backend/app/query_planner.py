@@ -0,0 +1,60 @@
+"""Decide which lemma_data columns a word search needs to probe.
+
+Greek columns (``form``, ``lemma``, ``normalized``, ``norm_form``) only hold
+Greek letters and the transliterated columns only hold ASCII, so a query
+written in one script can never match the other family. The planner
+classifies the query and hands the search engine the columns worth probing.
+"""
+from collections import namedtuple
+import logging
+
+from app.normalization import BETA_CODE_MARKERS
+from app.utils import is_ancient_greek
+
+logger = logging.getLogger(__name__)
+
+GREEK = 'greek'
+BETA_CODE = 'beta_code'
+LATIN = 'latin'
+MIXED = 'mixed'
+
+GREEK_COLUMNS = frozenset({'form', 'lemma', 'normalized', 'norm_form'})
+LATIN_COLUMNS = frozenset({'form_eng', 'norm_form_eng', 'full_eng', 'eng_lemma'})
+ALL_COLUMNS = GREEK_COLUMNS | LATIN_COLUMNS
+
+SCRIPT_COLUMNS = {
+    GREEK: GREEK_COLUMNS,
+    BETA_CODE: LATIN_COLUMNS,
+    LATIN: LATIN_COLUMNS,
+    MIXED: ALL_COLUMNS,
+}
+
+QueryPlan = namedtuple('QueryPlan', ['script', 'columns'])
+
+
+def _is_greek_letter(char):
+    return 'Ͱ' <= char <= 'Ͽ' or 'ἀ' <= char <= '῿'
+
+
+def classify_script(normalized):
+    """Classify an accent-stripped query as greek, beta_code, latin or mixed."""
+    if is_ancient_greek(normalized):
+        return GREEK
+    has_greek = any(_is_greek_letter(c) for c in normalized)
+    has_ascii = any(c.isascii() and c.isalpha() for c in normalized)
+    if has_greek and not has_ascii:
+        return GREEK
+    if has_ascii and not has_greek:
+        if any(c in BETA_CODE_MARKERS for c in normalized):
+            return BETA_CODE
+        return LATIN
+    return MIXED
+
+
+def plan_query(normalized):
+    """Build the plan for a query; the decision is logged at DEBUG level."""
+    script = classify_script(normalized)
+    plan = QueryPlan(script, SCRIPT_COLUMNS[script])
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Search plan for {normalized!r}: {script} -> {sorted(plan.columns)}")
+    return plan
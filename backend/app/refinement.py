@@ -0,0 +1,35 @@
+"""Per-session narrowed column keys for incremental (as-you-type) word search.
+
+Each typing session is identified by an opaque token handed back with every
+incremental response. Under it the server keeps the session's last query and,
+for each planned pattern column, the distinct column values that contained it
+(``LexiconIndex.pattern_keys``). When the next query only narrows the last one
+("ant" -> "anti"), only those values are re-checked instead of every value in
+the lexicon; ranking then runs as usual over the narrowed keys. Sessions live
+in a small LRU + TTL store and simply start over once evicted.
+"""
+import secrets
+
+from flask import current_app
+
+from app.cache import ResponseCache
+
+EXTENSION_KEY = 'refinement_cache'
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_TTL_SECONDS = 300
+
+
+def new_token():
+    return secrets.token_urlsafe(12)
+
+
+def init_app(app):
+    app.extensions[EXTENSION_KEY] = ResponseCache(
+        max_entries=app.config.get('REFINEMENT_CACHE_MAX_SESSIONS', DEFAULT_MAX_SESSIONS),
+        ttl=app.config.get('REFINEMENT_CACHE_TTL', DEFAULT_TTL_SECONDS),
+    )
+
+
+def get_refinement_cache():
+    return current_app.extensions[EXTENSION_KEY]
@@ -1,7 +1,14 @@
-from flask import Blueprint, jsonify, request
-from sqlalchemy import func
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
 from app import db, limiter
-from app.models import FullText, LemmaData, LemmaDefinition
+from app.bundle import get_bundle, has_snapshot, is_version, load_snapshot
+from app.cache import get_response_cache
+from app.completion_index import DEFAULT_COMPLETIONS, MAX_COMPLETIONS, get_completion_index
+from app.corpus import get_content_version
+from app.http_cache import conditional, no_store
+from app.line_store import get_line_store
+from app.page_store import get_page_store, page_lines
+from app.models import FullText
+from app.postag_table import get_postag_table
 from flask import send_from_directory
 from app.utils import (
     clean_word,
@@ -17,12 +24,24 @@ from app.utils import (
     API_VERSION,
 )
 from app.database_helpers import (
+    find_definition_rows,
+    find_morphology_rows,
+    find_word_rows,
     get_line,
     get_speaker,
+    group_rows_by_lemma,
+    iter_word_row_tiers,
+    refine_word_rows,
+    lemma_groups_payload,
     lookup_word_details,
-    search_by_definition,
+    normalized_payload,
+    suggest_words,
     get_word_defs,
+    word_details_payload,
 )
+from app.morphology_index import parse_morphology
+from app.query_language import run_query
+from app.pagination import decode_cursor, encode_cursor, page_size
 from http import HTTPStatus
 import logging
 
@@ -39,33 +58,95 @@ def _optional_speaker_query():
     return s if s else None
 
 
-def _fulltext_speaker_filters(query, speaker_wanted):
-    if not speaker_wanted:
-        return query
-    return query.filter(
-        FullText.speaker.isnot(None),
-        func.lower(FullText.speaker) == speaker_wanted.lower(),
-    )
+def _search_line_range():
+    """(first, last) lines from `page` or `start_line`/`end_line`, or None if unscoped.
 
+    `page` takes precedence. Bounds are clamped to MIN_LINE..MAX_LINE; a missing
+    bound defaults to the start/end of the play. Raises ValueError for
+    non-numeric values, an out-of-range page or an empty range.
+    """
+    page = request.args.get("page")
+    start = request.args.get("start_line")
+    end = request.args.get("end_line")
 
-def _filter_search_results_by_speaker(results, speaker_wanted):
-    if not speaker_wanted:
-        return results
-    want = speaker_wanted.casefold()
-    out = []
-    for entry in results:
-        if not entry or not isinstance(entry, list) or len(entry) < 1:
-            continue
-        meta = entry[0]
-        if not isinstance(meta, dict):
+    if page is not None and page.strip():
+        page = int(page)
+        if page < FIRST_PAGE or page > LAST_PAGE:
+            raise ValueError("Invalid page number")
+        return ((page - 1) * LINES_PER_PAGE + 1, page * LINES_PER_PAGE)
+
+    start = int(start) if start is not None and start.strip() else None
+    end = int(end) if end is not None and end.strip() else None
+    if start is None and end is None:
+        return None
+
+    first = max(MIN_LINE, start if start is not None else MIN_LINE)
+    last = min(MAX_LINE, end if end is not None else MAX_LINE)
+    if first > last:
+        raise ValueError("Empty line range")
+    return (first, last)
+
+
+# Most pages one /read?pages= batch, and most lines one /lines?set= batch, may ask for
+MAX_BATCH_PAGES = 20
+MAX_BATCH_LINES = MAX_BATCH_PAGES * LINES_PER_PAGE
+
+
+def _number_spans(raw, low, high, what):
+    """[(label, first, last)] from "1,5,90-120"; ValueError for bad, out-of-range,
+    duplicate or overlapping items."""
+    spans = []
+    for item in (raw or '').split(','):
+        item = item.strip()
+        if not item:
             continue
-        sp = meta.get("speaker") or ""
-        if sp.casefold() == want:
-            out.append(entry)
-    return out
+        first, _, last = item.partition('-')
+        first = int(first)
+        last = int(last) if last else first
+        if first < low or last > high or first > last:
+            raise ValueError(f"Invalid {what}: {item!r}")
+        spans.append((str(first) if first == last else f"{first}-{last}", first, last))
+    if not spans:
+        raise ValueError(f"No {what}s given")
+    ordered = sorted(spans, key=lambda span: span[1])
+    for (label, _, last), (next_label, first, _) in zip(ordered, ordered[1:]):
+        if first <= last:
+            raise ValueError(f"Overlapping {what}s: {label!r} and {next_label!r}")
+    return spans
+
+
+def _line_payload(rows):
+    return [{
+        "lineNum": line_num,
+        "line_text": line_text,
+        "speaker": speaker
+    } for line_num, line_text, speaker in rows]
+
+
+def _encoded_response(rendered):
+    """Serve a pre-rendered body in the smallest encoding the client accepts."""
+    encoding, body = rendered.negotiate(request.accept_encodings)
+    response = current_app.response_class(body, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(body))
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _normalized_format():
+    """True when the client asked for `format=normalized`."""
+    return request.args.get("format", "").strip().lower() == "normalized"
+
+
+def _flag_query(name):
+    """True when query arg `name` is 1/true/yes (case-insensitive)."""
+    return request.args.get(name, "").strip().lower() in ("1", "true", "yes")
+
 
 @bp.route('/get_all_speakers', methods=['GET'])  
 @limiter.limit("50/minute")
+@conditional
 def get_all_speakers():
     try:
         speakers = db.session.query(FullText.speaker).distinct().all()
@@ -77,6 +158,7 @@ def get_all_speakers():
 @bp.route('/lines/<startLine>', defaults={'endLine': None}, methods=['GET'])
 @bp.route('/lines/<startLine>/<endLine>', methods=['GET'])
 @limiter.limit("100/minute")
+@conditional
 def get_lines(startLine, endLine=None):
     end = None
     try:
@@ -122,19 +204,8 @@ def get_lines(startLine, endLine=None):
                 "speaker": speaker
             }])
 
-        # Fetch lines in range (optional speaker excludes non-matching lines)
-        lines = []
-        for line_num in range(start, end + 1):
-            line_text, speaker = get_line(line_num)
-            if sp and (not speaker or speaker.casefold() != sp.casefold()):
-                continue
-            lines.append({
-                "lineNum": line_num,
-                "line_text": line_text,
-                "speaker": speaker
-            })
-
-        return jsonify(lines)
+        # Lines in range (optional speaker excludes non-matching lines)
+        return jsonify(_line_payload(get_line_store().rows(start, end, sp, missing=True)))
 
     except ValueError as e:
         return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
@@ -146,31 +217,77 @@ def get_lines(startLine, endLine=None):
     
 @bp.route('/read/<int:page>', methods=['GET'])
 @limiter.limit("100/minute")
+@conditional
 def get_page(page):
+    """One reading page, served pre-rendered in the best encoding the client accepts."""
     try:
         if page < FIRST_PAGE or page > LAST_PAGE:
             return jsonify({"error": "Invalid page number"}), HTTPStatus.BAD_REQUEST
 
-        start_line = (page - 1) * LINES_PER_PAGE + 1
-        end_line = page * LINES_PER_PAGE
-        sp = _optional_speaker_query()
-
-        q = db.session.query(FullText).filter(
-            FullText.line_number.between(start_line, end_line)
-        )
-        q = _fulltext_speaker_filters(q, sp)
-        lines = q.order_by(FullText.line_number).all()
-
-        return jsonify([{
-            "lineNum": line.line_number,
-            "line_text": line.line_text,
-            "speaker": line.speaker
-        } for line in lines])
+        return _encoded_response(get_page_store().page(page, _optional_speaker_query()))
 
     except Exception as e:
         logger.error(f"Error in get_page: {str(e)}")
         return jsonify({"error": str(e)}), HTTPStatus.INTERNAL_SERVER_ERROR
     
+@bp.route('/lines', methods=['GET'])
+@limiter.limit("100/minute")
+@conditional
+def get_line_set():
+    """Several line spans at once, e.g. `set=1,5,90-120`, keyed by span.
+
+    Spans may not overlap and may cover at most MAX_BATCH_LINES lines.
+    Lines are read in one pass over the store, from the first line asked for
+    to the last; an optional `speaker` filters every span.
+    """
+    try:
+        spans = _number_spans(request.args.get("set"), MIN_LINE, MAX_LINE, "line set")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    if sum(last - first + 1 for _, first, last in spans) > MAX_BATCH_LINES:
+        return jsonify({"error": f"At most {MAX_BATCH_LINES} lines per request"}), HTTPStatus.BAD_REQUEST
+
+    rows = get_line_store().rows(
+        min(first for _, first, _ in spans), max(last for _, _, last in spans),
+        _optional_speaker_query(), missing=True,
+    )
+    by_line = {row[0]: row for row in rows}
+    return jsonify({
+        label: _line_payload(by_line[n] for n in range(first, last + 1) if n in by_line)
+        for label, first, last in spans
+    }), HTTPStatus.OK
+
+
+@bp.route('/read', methods=['GET'])
+@limiter.limit("100/minute")
+@conditional
+def get_pages():
+    """Several reading pages at once, e.g. `pages=3-7` or `pages=1,4`, keyed by page.
+
+    At most MAX_BATCH_PAGES pages, none repeated, read in one pass over the store.
+    """
+    try:
+        spans = _number_spans(request.args.get("pages"), FIRST_PAGE, LAST_PAGE, "page")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    pages = [page for _, first, last in sorted(spans, key=lambda span: span[1])
+             for page in range(first, last + 1)]
+    if len(pages) > MAX_BATCH_PAGES:
+        return jsonify({"error": f"At most {MAX_BATCH_PAGES} pages per request"}), HTTPStatus.BAD_REQUEST
+
+    rows = get_line_store().rows(
+        page_lines(pages[0])[0], page_lines(pages[-1])[1], _optional_speaker_query(),
+    )
+    by_page = {page: [] for page in pages}
+    for row in rows:
+        page = (row[0] - 1) // LINES_PER_PAGE + 1
+        if page in by_page:
+            by_page[page].append(row)
+    return jsonify({
+        str(page): _line_payload(page_rows) for page, page_rows in by_page.items()
+    }), HTTPStatus.OK
+
+
 @bp.route("/health", methods=["GET"])
 def health_check():
     return jsonify(status="ok"), HTTPStatus.OK
@@ -178,6 +295,7 @@ def health_check():
 
 @bp.route("/metadata", methods=["GET"])
 @limiter.limit("200/minute")
+@conditional
 def get_metadata():
     """Pagination and API constants for clients (avoids hardcoding page/line bounds)."""
     return jsonify(
@@ -192,53 +310,415 @@ def get_metadata():
     ), HTTPStatus.OK
 
 
+SEARCH_MODES = ('word', 'definition')
+# Internal mode for searches given only morphology filters (no `q`)
+MORPHOLOGY_MODE = 'morphology'
+
+
+def _search_cache_key(mode, query, speaker, line_range=None, extras=()):
+    """Cache key for a search: version, mode, normalized query, speaker, range
+    and any response-shaping options (`extras`).
+
+    Word searches depend only on the clean_word form of the query (the
+    accent-stripped form is derived from it), so that is what gets keyed.
+    """
+    if mode != 'definition':
+        query = clean_word(query)
+    return (
+        get_content_version(),
+        mode,
+        query,
+        speaker.casefold() if speaker else None,
+        line_range,
+        tuple(extras),
+    )
+
+
+def _morphology_key(morphology):
+    """Cache-key extras for the morphology filters (empty without any)."""
+    if not morphology:
+        return ()
+    return (("morphology",) + tuple(
+        (feature, ''.join(sorted(chars))) for feature, chars in sorted(morphology.items())
+    ),)
+
+
+def _cached_json(key, produce):
+    """Serve JSON bytes from the response cache, producing them on a miss."""
+    cache = get_response_cache()
+    body = cache.get(key)
+    status = 'HIT'
+    if body is None:
+        body = jsonify(produce()).get_data()
+        cache.put(key, body)
+        status = 'MISS'
+    response = current_app.response_class(body, mimetype='application/json')
+    response.headers['X-Cache'] = status
+    return response
+
+
+def _find_rows(mode):
+    if mode == MORPHOLOGY_MODE:
+        return find_morphology_rows
+    return find_definition_rows if mode == 'definition' else find_word_rows
+
+
+def _render_rows(normalized):
+    return normalized_payload if normalized else word_details_payload
+
+
+def _lemma_groups(mode, safe_query, sp, line_range, morphology=None):
+    """Every hit grouped by lemma in rank order, computed once per query and
+    kept in the response cache so later pages only slice and hydrate."""
+    cache = get_response_cache()
+    key = _search_cache_key(mode, safe_query, sp, line_range,
+                            extras=("lemma-groups",) + _morphology_key(morphology))
+    groups = cache.get(key)
+    if groups is None:
+        groups = tuple(group_rows_by_lemma(_find_rows(mode)(
+            safe_query, speaker=sp, line_range=line_range, limit=None, morphology=morphology,
+        )))
+        cache.put(key, groups)
+    return groups
+
+
+def _run_paged_search(mode, safe_query, sp, line_range, offset, size,
+                      group=False, suggest=False, normalized=False, morphology=None):
+    """One page of hits (or of lemma groups) plus the cursor of the next page.
+
+    Flat pages rank only as far as the end of the page and hydrate only the
+    page's rows. Grouped pages need every hit for complete counts, so the
+    ordered group list is shared by all pages of a query (see _lemma_groups)
+    and each page hydrates only its own groups.
+    """
+    if group:
+        groups = _lemma_groups(mode, safe_query, sp, line_range, morphology=morphology)
+        results = lemma_groups_payload(groups[offset:offset + size])
+        found = len(results)
+        has_more = len(groups) > offset + size
+    else:
+        rows = _find_rows(mode)(
+            safe_query, speaker=sp, line_range=line_range, limit=offset + size + 1, morphology=morphology,
+        )
+        page = rows[offset:offset + size]
+        results = _render_rows(normalized)(page)
+        found = len(page)
+        has_more = len(rows) > offset + size
+
+    logger.info(f"Returning {found} results from offset {offset}")
+    body = {
+        "results": results,
+        "next_cursor": encode_cursor(offset + size, get_content_version()) if has_more else None,
+    }
+    if suggest:
+        body["suggestions"] = []
+        if not found and offset == 0 and mode == 'word':
+            body["suggestions"] = suggest_words(safe_query)
+    return body
+
+
+def _run_search(mode, safe_query, sp, line_range=None, suggest=False, normalized=False,
+                morphology=None):
+    rows = _find_rows(mode)(safe_query, speaker=sp, line_range=line_range, morphology=morphology)
+    results = _render_rows(normalized)(rows)
+
+    logger.info(f"Returning {len(rows)} results")
+    if suggest:
+        suggestions = []
+        if not rows and mode == 'word':
+            suggestions = suggest_words(safe_query)
+        return {"results": results, "suggestions": suggestions}
+    return results
+
+
+# Longest session token accepted from clients (server tokens are 16 chars)
+MAX_SESSION_TOKEN = 64
+
+
+def _run_incremental_search(safe_query, sp, token, suggest=False, normalized=False,
+                            morphology=None):
+    """Word search that narrows the session's previous match set when it can."""
+    if token and len(token) > MAX_SESSION_TOKEN:
+        token = None
+    rows, token, _ = refine_word_rows(safe_query, token=token, speaker=sp, morphology=morphology)
+    body = {"results": _render_rows(normalized)(rows), "token": token}
+    if suggest:
+        body["suggestions"] = [] if rows else suggest_words(safe_query)
+    return body
+
+
+def _search_chunks(mode, safe_query, sp, line_range=None, morphology=None):
+    """(tier, rows) chunks of a streamed search.
+
+    Unscoped word searches come tier by tier; definition, morphology-only and
+    line-scoped searches are not ranked in tiers and arrive as one chunk.
+    """
+    if mode != 'word':
+        yield mode, _find_rows(mode)(safe_query, speaker=sp, line_range=line_range, morphology=morphology)
+    elif line_range:
+        yield 'lines', find_word_rows(safe_query, speaker=sp, line_range=line_range, morphology=morphology)
+    else:
+        yield from iter_word_row_tiers(safe_query, speaker=sp, morphology=morphology)
+
+
+def _stream_search(mode, safe_query, sp, line_range=None, normalized=False, morphology=None):
+    """NDJSON lines: one {"tier", "results"} per non-empty tier, then
+    {"tier": "fuzzy", "suggestions"} when a word search found nothing, and
+    a closing {"done", "count"}."""
+    dumps = current_app.json.dumps
+    render = _render_rows(normalized)
+    count = 0
+    try:
+        for tier, rows in _search_chunks(mode, safe_query, sp, line_range, morphology=morphology):
+            if rows:
+                count += len(rows)
+                yield dumps({"tier": tier, "results": render(rows)}) + "\n"
+        if not count and mode == 'word':
+            suggestions = suggest_words(safe_query)
+            if suggestions:
+                yield dumps({"tier": "fuzzy", "suggestions": suggestions}) + "\n"
+    except Exception as e:
+        logger.error(f"Streaming search error: {str(e)}", exc_info=True)
+        yield dumps({"done": True, "count": count, "error": "Internal server error"}) + "\n"
+        return
+    logger.info(f"Streamed {count} results")
+    yield dumps({"done": True, "count": count}) + "\n"
+
+
 @bp.route('/search', methods=['GET'])
 @limiter.limit("30 per minute")
+@conditional
 def search():
     logger.info("\n=== NEW SEARCH REQUEST ===")
     logger.info(f"Request args: {request.args}")
     
     mode = request.args.get('mode')
     query = request.args.get('q')
-    
-    if not query or not mode:
+
+    try:
+        morphology = parse_morphology(request.args)
+    except ValueError as e:
+        logger.warning(f"Invalid morphology filter: {str(e)}")
+        return jsonify([]), HTTPStatus.OK
+
+    if morphology and not (query and query.strip()):
+        # Filter-only search ("all aorist participles"), in line order
+        mode, query = MORPHOLOGY_MODE, ''
+    elif not query or not mode:
         logger.warning("Missing search parameters")
         return jsonify([]), HTTPStatus.OK  # Gracefully return empty list
 
-    safe_query = query.strip()
-    results = []
+    if mode not in SEARCH_MODES and mode != MORPHOLOGY_MODE:
+        logger.warning("Invalid search mode")
+        return jsonify([]), HTTPStatus.OK  # Invalid mode = empty list
 
     try:
-        if mode == 'definition':
-            lemma_keys = search_by_definition(safe_query)
-            for lemma_id, line_number in lemma_keys:
-                word = LemmaData.query.filter_by(
-                    lemma_id=lemma_id,
-                    line_number=line_number
-                ).first()
-                if word:
-                    word_data = lookup_word_details(word.lemma)
-                    if word_data:
-                        results.extend(word_data)
-
-        elif mode == 'word':
-            results = lookup_word_details(safe_query)
-        else:
-            logger.warning("Invalid search mode")
-            return jsonify([]), HTTPStatus.OK  # Invalid mode = empty list
+        line_range = _search_line_range()
+    except ValueError as e:
+        logger.warning(f"Invalid search line range: {str(e)}")
+        return jsonify([]), HTTPStatus.OK
 
-        sp = _optional_speaker_query()
-        results = _filter_search_results_by_speaker(results, sp)
+    safe_query = query.strip()
+    sp = _optional_speaker_query()
+    # Opt-in object response {"results", "suggestions"}; plain list otherwise
+    suggest = _flag_query("suggest")
+    # Opt-in paging ({"results", "next_cursor"}): group=lemma, cursor or limit
+    group = request.args.get("group", "").strip().lower() == "lemma"
+    paged = group or "cursor" in request.args or "limit" in request.args
+    # format=normalized: lemma/postag/speaker maps plus compact occurrences
+    normalized = _normalized_format() and not group
+
+    extras = ("suggest",) if suggest else ()
+    extras += ("format:normalized",) if normalized else ()
+    extras += _morphology_key(morphology)
+
+    # incremental=1: {"results", "token"}; pass the token back as `prev` on
+    # the next keystroke. Unscoped word searches only, never cached.
+    if _flag_query("incremental") and mode == 'word' and not line_range:
+        try:
+            response = jsonify(_run_incremental_search(
+                safe_query, sp, request.args.get("prev", "").strip() or None,
+                suggest=suggest, normalized=normalized, morphology=morphology,
+            ))
+            return no_store(response)  # carries a session token
+        except Exception as e:
+            logger.error(f"Incremental search error: {str(e)}", exc_info=True)
+            return no_store(jsonify({"results": [], "token": None}))
+
+    # stream=1: NDJSON tier by tier, uncached; paging options do not apply.
+    # Headers go out before the body, which may still end in an error line.
+    if _flag_query("stream"):
+        return no_store(current_app.response_class(
+            stream_with_context(_stream_search(
+                mode, safe_query, sp, line_range, normalized=normalized, morphology=morphology,
+            )),
+            mimetype='application/x-ndjson',
+        ))
 
-        logger.info(f"Returning {len(results)} results")
-        return jsonify(results)
+    try:
+        if paged:
+            try:
+                offset = decode_cursor(request.args.get("cursor", "").strip(), get_content_version())
+                size = page_size(request.args.get("limit", "").strip())
+            except ValueError as e:
+                logger.warning(f"Invalid search paging: {str(e)}")
+                return jsonify({"results": [], "next_cursor": None}), HTTPStatus.OK
+            extras += ("group:lemma",) if group else ()
+            return _cached_json(
+                _search_cache_key(mode, safe_query, sp, line_range, extras=extras + ("page", offset, size)),
+                lambda: _run_paged_search(
+                    mode, safe_query, sp, line_range, offset, size,
+                    group=group, suggest=suggest, normalized=normalized, morphology=morphology,
+                ),
+            )
+
+        return _cached_json(
+            _search_cache_key(mode, safe_query, sp, line_range, extras=extras),
+            lambda: _run_search(
+                mode, safe_query, sp, line_range,
+                suggest=suggest, normalized=normalized, morphology=morphology,
+            ),
+        )
 
     except Exception as e:
         logger.error(f"Search error: {str(e)}", exc_info=True)
-        return jsonify([]), HTTPStatus.OK  # Always return an empty list on error
+        return no_store(jsonify([]))  # Always return an empty list on error, never cached
     
+@bp.route('/query', methods=['GET'])
+@limiter.limit("30 per minute")
+@conditional(weak=True)  # the plan carries per-run timings
+def structured_query():
+    """Structured search, e.g. `q=lemma:λόγος case:gen speaker:Κρέων lines:1-300`.
+
+    Returns {"results", "count", "plan", "next_cursor"}, matches in line
+    order; `plan` lists the predicates in the order they were evaluated.
+    Supports `format=normalized` and `cursor`/`limit` like /search.
+    """
+    text = (request.args.get('q') or '').strip()
+    normalized = _normalized_format()
+    try:
+        offset = decode_cursor(request.args.get("cursor", "").strip(), get_content_version())
+        size = page_size(request.args.get("limit", "").strip())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+
+    def produce():
+        rows, steps = run_query(text)
+        page = rows[offset:offset + size]
+        has_more = len(rows) > offset + size
+        return {
+            "results": _render_rows(normalized)(page),
+            "count": len(rows),
+            "plan": steps,
+            "next_cursor": encode_cursor(offset + size, get_content_version()) if has_more else None,
+        }
+
+    try:
+        return _cached_json(
+            (get_content_version(), 'query', text, normalized, offset, size),
+            produce,
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid structured query {text!r}: {str(e)}")
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    except Exception as e:
+        logger.error(f"Structured query error: {str(e)}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+@bp.route('/suggest', methods=['GET'])
+@limiter.limit("300 per minute")
+@conditional
+def suggest():
+    """Typeahead: top completions for a prefix, ranked by corpus frequency.
+
+    Served straight from the completion trie; no row hydration.
+    """
+    prefix = strip_accents(clean_word((request.args.get('q') or '').strip()))
+    if not prefix:
+        return jsonify([]), HTTPStatus.OK
+
+    try:
+        limit = int(request.args.get('limit', DEFAULT_COMPLETIONS))
+    except ValueError:
+        limit = DEFAULT_COMPLETIONS
+    limit = max(1, min(limit, MAX_COMPLETIONS))
+
+    return jsonify([
+        {"text": text, "lemma": lemma, "count": count}
+        for text, lemma, count in get_completion_index().complete(prefix, limit)
+    ]), HTTPStatus.OK
+
+
 @bp.route('/word-details/<word>', methods=['GET'])
 @limiter.limit("200 per minute")
+@conditional
 def get_word_details(word):
     
-    return jsonify(lookup_word_details(word))
\ No newline at end of file
+    # Same payload as an unscoped word search, so it shares that cache entry
+    if _normalized_format():
+        return _cached_json(
+            _search_cache_key('word', word.strip(), None, extras=("format:normalized",)),
+            lambda: normalized_payload(find_word_rows(word)),
+        )
+    return _cached_json(
+        _search_cache_key('word', word.strip(), None),
+        lambda: lookup_word_details(word),
+    )
+
+
+@bp.route('/postags', methods=['GET'])
+@limiter.limit("100/minute")
+@conditional
+def get_postags():
+    """Decoded features keyed by postag: every corpus tag, or the comma-separated `tags`
+    (tags that do not decode, e.g. with unknown feature letters, are left out).
+
+    Lets clients of the normalized search format decode tags they already
+    hold. Built from the postag table's pre-serialized fragments.
+    """
+    table = get_postag_table()
+    raw = request.args.get("tags")
+    if raw is None:
+        tags = sorted(table)
+    else:
+        tags = sorted({t for t in (t.strip() for t in raw.split(",")) if t in table or table.decode(t)})
+    body = "{" + ",".join(
+        f"{current_app.json.dumps(tag)}:{table.json(tag)}" for tag in tags
+    ) + "}"
+    return current_app.response_class(body, mimetype='application/json')
+
+
+@bp.route('/bundle', methods=['GET'])
+@limiter.limit("10/minute")
+@conditional
+def get_bundle_snapshot():
+    """The whole corpus as one versioned snapshot for offline use (see app.bundle)."""
+    return _encoded_response(get_bundle().rendered)
+
+
+@bp.route('/bundle/delta', methods=['GET'])
+@limiter.limit("30/minute")
+@conditional
+def get_bundle_delta():
+    """Rows changed since the bundle `since`; 410 if that version is unknown here."""
+    since = (request.args.get("since") or "").strip()
+    if not is_version(since):
+        return jsonify({"error": "Invalid bundle version"}), HTTPStatus.BAD_REQUEST
+    if not has_snapshot(since):
+        return jsonify({
+            "error": "Unknown bundle version; download /bundle again",
+            "version": get_content_version(),
+        }), HTTPStatus.GONE
+    # The stored snapshot is only read and parsed on a response-cache miss
+    return _cached_json(
+        (get_content_version(), 'bundle-delta', since),
+        lambda: get_bundle().delta(load_snapshot(since)),
+    )
+
+
+@bp.route('/cache-stats', methods=['GET'])
+@limiter.limit("30/minute")
+def get_cache_stats():
+    """Response cache counters, for sizing RESPONSE_CACHE_MAX_ENTRIES / _TTL."""
+    return jsonify(get_response_cache().stats()), HTTPStatus.OK
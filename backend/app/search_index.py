@@ -0,0 +1,550 @@
+"""In-process lexicon index used by word search.
+
+The index is built once per corpus version from ``lemma_data`` (see
+``app.corpus``) and never mutated, so it can be shared between request threads
+without locking. It reproduces the ranking of
+the old SQL search: exact column matches first, then prefixes, then substrings,
+with ties broken by ``length(form)`` and ``line_number``.
+
+When the database carries the ``lemma_search`` FTS5 trigram table (built by
+``database/db_setup.py``), substring probes go through it instead of scanning
+every distinct column value, provided its rowids still match ``lemma_data``
+when the index is built.
+"""
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+import heapq
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import corpus, db
+from app.models import FullText, LemmaData
+from app.query_planner import plan_query
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'lexicon_index'
+SPEAKER_LINES_NAME = 'speaker_lines'
+
+ROW_FIELDS = (
+    'lemma_id', 'line_number', 'lemma', 'form', 'postag', 'normalized',
+    'norm_form', 'full_eng', 'eng_lemma', 'form_eng', 'norm_form_eng',
+)
+
+LexiconRow = namedtuple('LexiconRow', ROW_FIELDS)
+
+# (rank, column, needle) — needle is 'cleaned' or 'normalized' query text.
+# Ranks mirror the CASE expression the SQL search used to sort by.
+EXACT_RANKS = (
+    (1, 'form', 'cleaned'),
+    (2, 'lemma', 'cleaned'),
+    (3, 'normalized', 'normalized'),
+    (4, 'norm_form', 'normalized'),
+    (5, 'form_eng', 'cleaned'),
+    (6, 'norm_form_eng', 'normalized'),
+    (7, 'eng_lemma', 'normalized'),
+    (8, 'eng_lemma', 'cleaned'),
+)
+PREFIX_RANKS = (
+    (11, 'norm_form', 'normalized'),
+    (12, 'normalized', 'normalized'),
+    (13, 'form_eng', 'cleaned'),
+    (14, 'norm_form_eng', 'normalized'),
+    (15, 'full_eng', 'cleaned'),
+    (16, 'eng_lemma', 'normalized'),
+)
+CONTAINS_RANKS = (
+    (21, 'norm_form', 'normalized'),
+    (22, 'normalized', 'normalized'),
+    (23, 'form_eng', 'cleaned'),
+    (24, 'norm_form_eng', 'normalized'),
+    (25, 'full_eng', 'cleaned'),
+    (26, 'eng_lemma', 'normalized'),
+)
+
+TIERS = (
+    ('exact', EXACT_RANKS),
+    ('prefix', PREFIX_RANKS),
+    ('contains', CONTAINS_RANKS),
+)
+
+# Rank -> position of its tier, for queries ranked by tier only
+RANK_TIERS = {rank: i for i, (_, specs) in enumerate(TIERS) for rank, _, _ in specs}
+
+EXACT_COLUMNS = tuple(sorted({col for _, col, _ in EXACT_RANKS}))
+PATTERN_COLUMNS = tuple(sorted({col for _, col, _ in PREFIX_RANKS + CONTAINS_RANKS}))
+
+MAX_RESULTS = 500
+
+FTS_TABLE = 'lemma_search'
+# The trigram tokenizer cannot match phrases shorter than one trigram.
+FTS_MIN_CHARS = 3
+
+# SQLite's LIKE (used by startswith/contains) folds ASCII case only.
+_ASCII_FOLD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def fold(value):
+    """Case-fold ASCII letters only, matching SQLite LIKE semantics."""
+    return value.translate(_ASCII_FOLD)
+
+
+class _SortedKeys:
+    """Distinct folded values of one column, sorted for prefix probes."""
+
+    def __init__(self, postings):
+        self.keys = tuple(sorted(postings))
+        self.postings = tuple(postings[k] for k in self.keys)
+        self.by_key = postings
+
+    def prefix(self, needle):
+        i = bisect_left(self.keys, needle)
+        keys = self.keys
+        while i < len(keys) and keys[i].startswith(needle):
+            yield self.postings[i]
+            i += 1
+
+    def contains(self, needle):
+        for key, positions in zip(self.keys, self.postings):
+            if needle in key:
+                yield positions
+
+
+def _fts_phrase(needle):
+    return '"' + needle.replace('"', '""') + '"'
+
+
+class FtsSubstringSource:
+    """Candidate rows for the contains tier from the ``lemma_search`` table.
+
+    Trigram matching folds case beyond ASCII, so callers re-check candidates
+    against the exact LIKE semantics; this only has to return a superset.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @staticmethod
+    def available(session):
+        found = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE},
+        ).first()
+        return found is not None
+
+    @staticmethod
+    def consistent(session):
+        """True if ``lemma_search`` still indexes exactly the current ``lemma_data`` rowids.
+
+        The table is external content keyed on lemma_data's implicit rowid,
+        which VACUUM or a re-insert can renumber; a stale index would then
+        silently miss contains-tier rows, since candidates are only re-checked
+        for false positives. The check only reads (the rowids of the
+        ``_docsize`` shadow table), so it works on a read-only database.
+        """
+        try:
+            stale = session.execute(text(
+                f"SELECT (SELECT count(*) FROM {FTS_TABLE}_docsize) != (SELECT count(*) FROM lemma_data) "
+                f"OR EXISTS (SELECT 1 FROM lemma_data d "
+                f"LEFT JOIN {FTS_TABLE}_docsize s ON s.id = d.rowid WHERE s.id IS NULL)"
+            )).scalar()
+        except SQLAlchemyError as e:
+            logger.warning(f"{FTS_TABLE} could not be checked against lemma_data, scanning in memory: {str(e)}")
+            return False
+        if stale:
+            logger.warning(f"{FTS_TABLE} is out of sync with lemma_data (rebuild it with database/db_setup.py), "
+                           f"scanning in memory")
+            return False
+        return True
+
+    def keys(self, needles, columns=PATTERN_COLUMNS):
+        """(lemma_id, line_number) of rows whose ``columns`` contain any needle."""
+        expr = '{%s} : (%s)' % (
+            ' '.join(sorted(columns)),
+            ' OR '.join(_fts_phrase(n) for n in sorted(set(needles))),
+        )
+        return self.session.execute(
+            text(
+                f"SELECT d.lemma_id, d.line_number FROM {FTS_TABLE} "
+                f"JOIN lemma_data d ON d.rowid = {FTS_TABLE}.rowid "
+                f"WHERE {FTS_TABLE} MATCH :expr"
+            ),
+            {'expr': expr},
+        ).all()
+
+
+class LexiconIndex:
+    """Immutable index over ``lemma_data`` rows.
+
+    Rows are stored pre-sorted by ``(length(form), line_number, lemma_id)`` so a
+    row's position doubles as its tie-break key within a rank.
+    """
+
+    def __init__(self, rows, substring_source=None):
+        rows = sorted(rows, key=lambda r: (len(r.form or ''), r.line_number, r.lemma_id))
+        self.rows = tuple(rows)
+        self.substring_source = substring_source
+        self._positions = {(r.lemma_id, r.line_number): pos for pos, r in enumerate(self.rows)}
+        self._line_numbers = tuple(r.line_number for r in self.rows)
+        # Positions in line order, with their line numbers, for range scans
+        self._by_line = tuple(sorted(range(len(self.rows)), key=lambda pos: (self._line_numbers[pos], pos)))
+        self._by_line_keys = tuple(self._line_numbers[pos] for pos in self._by_line)
+        self._by_line_rank = [0] * len(self.rows)
+        for rank, pos in enumerate(self._by_line):
+            self._by_line_rank[pos] = rank
+        by_lemma = {}
+        for pos in self._by_line:
+            by_lemma.setdefault(self.rows[pos].lemma_id, []).append(pos)
+        self._by_lemma = {lemma_id: tuple(positions) for lemma_id, positions in by_lemma.items()}
+
+        exact = {col: {} for col in EXACT_COLUMNS}
+        patterns = {col: {} for col in PATTERN_COLUMNS}
+        for pos, row in enumerate(self.rows):
+            for col in EXACT_COLUMNS:
+                value = getattr(row, col)
+                if value:
+                    exact[col].setdefault(value, []).append(pos)
+            for col in PATTERN_COLUMNS:
+                value = getattr(row, col)
+                if value:
+                    patterns[col].setdefault(fold(value), []).append(pos)
+
+        self._exact = {
+            col: {value: tuple(positions) for value, positions in values.items()}
+            for col, values in exact.items()
+        }
+        self._patterns = {
+            col: _SortedKeys({k: tuple(v) for k, v in values.items()})
+            for col, values in patterns.items()
+        }
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def from_session(cls, session):
+        """Load every ``lemma_data`` row through the given session."""
+        columns = [getattr(LemmaData, name) for name in ROW_FIELDS]
+        rows = [LexiconRow(*r) for r in session.query(*columns).all()]
+        source = None
+        if FtsSubstringSource.available(session) and FtsSubstringSource.consistent(session):
+            source = FtsSubstringSource(session)
+        return cls(rows, substring_source=source)
+
+    def _contains_candidates(self, folded, columns):
+        """Row positions that may satisfy a contains rank, or None to scan keys."""
+        if self.substring_source is None:
+            return None
+        if min(len(n) for n in folded.values()) < FTS_MIN_CHARS:
+            return None
+        keys = self.substring_source.keys(folded.values(), columns)
+        return sorted({self._positions[k] for k in map(tuple, keys) if k in self._positions})
+
+    def pattern_keys(self, cleaned, normalized, plan, previous=None):
+        """Distinct folded values of each planned pattern column that contain
+        the query: ``{column: keys}``.
+
+        Every prefix or substring hit of the query is filed under one of these
+        keys, so they can stand in for the whole column. ``previous`` is the
+        result for a query whose needles occur in this one's (see
+        ``can_refine``); only its keys need checking.
+        """
+        folded = {'cleaned': fold(cleaned), 'normalized': fold(normalized)}
+        keys = {}
+        for _, col, needle in CONTAINS_RANKS:
+            if col in plan.columns:
+                source = previous[col] if previous is not None else self._patterns[col].keys
+                keys[col] = tuple(k for k in source if folded[needle] in k)
+        return keys
+
+    def _postings(self, kind, col, needle, folded, contains_candidates, pattern_keys=None):
+        """Sorted position tuples matching one rank spec."""
+        if kind == 'exact':
+            return [self._exact[col].get(needle, ())]
+        if pattern_keys is not None:
+            by_key = self._patterns[col].by_key
+            if kind == 'prefix':
+                return [by_key[k] for k in pattern_keys[col] if k.startswith(folded)]
+            return [by_key[k] for k in pattern_keys[col]]
+        if kind == 'prefix':
+            return list(self._patterns[col].prefix(folded))
+        candidates = contains_candidates()
+        if candidates is None:
+            return list(self._patterns[col].contains(folded))
+        return [[pos for pos in candidates if folded in fold(getattr(self.rows[pos], col) or '')]]
+
+    def ranked_tiers(self, cleaned, normalized, plan, limit, coarse=False, line_numbers=None,
+                     pattern_keys=None, allowed=None):
+        """Yield ``(tier, positions)`` for exact, prefix and contains, best first.
+
+        Rank groups are probed in order; each group keeps only the ``limit``
+        smallest new positions (a bounded heap — positions already encode the
+        length/line tie-break), and probing stops as soon as the limit is
+        filled. The substring tier is therefore skipped whenever exact and
+        prefix hits are enough, and since tiers are produced lazily a caller
+        can act on the exact hits before the later tiers are probed. With
+        ``coarse`` the ranks of a tier form one group. Only ranks on columns
+        in ``plan.columns`` are probed, and with ``line_numbers`` only rows on
+        those lines count towards the limit; likewise with ``allowed``, a set
+        of row positions (e.g. a morphology filter). ``pattern_keys`` (from
+        ``pattern_keys``) replaces the prefix and substring probes.
+        """
+        needles = {'cleaned': cleaned, 'normalized': normalized}
+        folded = {'cleaned': fold(cleaned), 'normalized': fold(normalized)}
+        contains_columns = {col for _, col, _ in CONTAINS_RANKS if col in plan.columns}
+        memo = []
+
+        def contains_candidates():
+            if not memo:
+                memo.append(self._contains_candidates(folded, contains_columns))
+            return memo[0]
+
+        found = 0
+        seen = set()
+        for kind, specs in TIERS:
+            specs = [spec for spec in specs if spec[1] in plan.columns]
+            groups = [specs] if coarse else [[spec] for spec in specs]
+            tier = []
+            for group in groups:
+                fresh = set()
+                for _, col, needle in group:
+                    for positions in self._postings(
+                        kind, col, needles[needle], folded[needle], contains_candidates,
+                        pattern_keys,
+                    ):
+                        fresh.update(positions)
+                fresh -= seen
+                if line_numbers is not None:
+                    line_of = self._line_numbers
+                    fresh = {pos for pos in fresh if line_of[pos] in line_numbers}
+                if allowed is not None:
+                    fresh &= allowed
+                room = limit - found - len(tier)
+                if len(fresh) > room:
+                    tier.extend(heapq.nsmallest(room, fresh))
+                    yield kind, tier
+                    return
+                tier.extend(sorted(fresh))
+                seen |= fresh
+                if found + len(tier) == limit:
+                    yield kind, tier
+                    return
+            found += len(tier)
+            yield kind, tier
+
+    def ranked_positions(self, cleaned, normalized, plan, limit, coarse=False, line_numbers=None,
+                         pattern_keys=None, allowed=None):
+        """Return up to ``limit`` matching row positions, best first (see ``ranked_tiers``)."""
+        return [
+            pos
+            for _, positions in self.ranked_tiers(
+                cleaned, normalized, plan, limit, coarse=coarse, line_numbers=line_numbers,
+                pattern_keys=pattern_keys, allowed=allowed,
+            )
+            for pos in positions
+        ]
+
+    def search(self, cleaned, normalized, limit=MAX_RESULTS, plan=None, line_numbers=None,
+               pattern_keys=None, allowed=None):
+        """Return matching rows ordered exact > prefix > contains.
+
+        Queries of one or two characters only rank by tier, so strong ties
+        (e.g. single letter 'o') are not split by which column matched.
+        Without an explicit ``plan`` the query planner picks the columns.
+        ``line_numbers`` restricts hits to a set of lines (e.g. one speaker's)
+        and ``allowed`` to a set of row positions. ``limit=None`` returns
+        every match.
+        """
+        if not normalized:
+            return []
+        if plan is None:
+            plan = plan_query(normalized)
+        if limit is None:
+            limit = len(self.rows)
+        ranked = self.ranked_positions(
+            cleaned, normalized, plan, limit,
+            coarse=len(normalized) <= 2, line_numbers=line_numbers,
+            pattern_keys=pattern_keys, allowed=allowed,
+        )
+        return [self.rows[pos] for pos in ranked]
+
+    def search_tiers(self, cleaned, normalized, limit=MAX_RESULTS, plan=None, line_numbers=None,
+                     allowed=None):
+        """Like ``search``, but yield ``(tier, rows)`` one tier at a time."""
+        if not normalized:
+            return
+        if plan is None:
+            plan = plan_query(normalized)
+        for kind, positions in self.ranked_tiers(
+            cleaned, normalized, plan, limit,
+            coarse=len(normalized) <= 2, line_numbers=line_numbers, allowed=allowed,
+        ):
+            yield kind, [self.rows[pos] for pos in positions]
+
+    def occurrences(self, lemma_ids, limit=MAX_RESULTS, line_numbers=None, line_range=None,
+                    allowed=None):
+        """Rows of the given lemmas, lemma by lemma in the given order, by line.
+
+        ``line_numbers`` (a set), ``line_range`` (first, last) and ``allowed``
+        (a set of row positions) restrict which occurrences are returned.
+        """
+        rows = []
+        for lemma_id in dict.fromkeys(lemma_ids):
+            for pos in self._by_lemma.get(lemma_id, ()):
+                line = self._line_numbers[pos]
+                if line_numbers is not None and line not in line_numbers:
+                    continue
+                if line_range and not line_range[0] <= line <= line_range[1]:
+                    continue
+                if allowed is not None and pos not in allowed:
+                    continue
+                rows.append(self.rows[pos])
+                if len(rows) == limit:
+                    return rows
+        return rows
+
+    def exact_positions(self, col, value):
+        """Positions of rows whose ``col`` equals ``value`` (an exact-rank column)."""
+        return self._exact[col].get(value, ())
+
+    def lemma_positions(self, lemma_id):
+        """Positions of a lemma's rows, in line order."""
+        return self._by_lemma.get(lemma_id, ())
+
+    def line_positions(self, first_line, last_line):
+        """Positions of the rows on lines ``first_line``..``last_line``, in line order."""
+        lo = bisect_left(self._by_line_keys, first_line)
+        hi = bisect_right(self._by_line_keys, last_line)
+        return self._by_line[lo:hi]
+
+    def word_matcher(self, cleaned, normalized, plan=None):
+        """Test ``pos -> bool``: does the row match a word search for the query?"""
+        if plan is None:
+            plan = plan_query(normalized)
+        needles = {'cleaned': cleaned, 'normalized': normalized}
+        folded = {'cleaned': fold(cleaned), 'normalized': fold(normalized)}
+        specs = _planned_specs(plan)
+        rows = self.rows
+        return lambda pos: self._match_rank(rows[pos], needles, folded, specs) is not None
+
+    def rows_at(self, allowed, limit=MAX_RESULTS, line_range=None):
+        """Rows at the ``allowed`` positions, in line order, optionally within
+        ``line_range`` (first, last). ``limit=None`` returns them all."""
+        if line_range:
+            lo = bisect_left(self._by_line_keys, line_range[0])
+            hi = bisect_right(self._by_line_keys, line_range[1])
+        else:
+            lo, hi = 0, len(self._by_line)
+        rows = []
+        for pos in sorted(allowed, key=self._by_line_rank.__getitem__):
+            if lo <= self._by_line_rank[pos] < hi:
+                rows.append(self.rows[pos])
+                if len(rows) == limit:
+                    break
+        return rows
+
+    def _match_rank(self, row, needles, folded, specs):
+        """Best rank of one row against the planned specs, or None."""
+        for rank, kind, col, needle in specs:
+            value = getattr(row, col)
+            if not value:
+                continue
+            if kind == 'exact':
+                if value == needles[needle]:
+                    return rank
+            elif kind == 'prefix':
+                if fold(value).startswith(folded[needle]):
+                    return rank
+            elif folded[needle] in fold(value):
+                return rank
+        return None
+
+    def search_lines(self, cleaned, normalized, first_line, last_line,
+                     limit=MAX_RESULTS, plan=None, line_numbers=None, allowed=None):
+        """Return matching rows on lines ``first_line``..``last_line``, in line order.
+
+        Only the rows inside the range are examined, so the cost follows the
+        size of the range rather than the number of matches in the play.
+        Rows on the same line keep the order ``search`` gives them, including
+        its tier-only ranking of one- and two-character queries.
+        """
+        if not normalized:
+            return []
+        if plan is None:
+            plan = plan_query(normalized)
+        needles = {'cleaned': cleaned, 'normalized': normalized}
+        folded = {'cleaned': fold(cleaned), 'normalized': fold(normalized)}
+        specs = _planned_specs(plan)
+        coarse = len(normalized) <= 2
+        lo = bisect_left(self._by_line_keys, first_line)
+        hi = bisect_right(self._by_line_keys, last_line)
+
+        hits = []
+        for pos in self._by_line[lo:hi]:
+            if line_numbers is not None and self._line_numbers[pos] not in line_numbers:
+                continue
+            if allowed is not None and pos not in allowed:
+                continue
+            rank = self._match_rank(self.rows[pos], needles, folded, specs)
+            if rank is not None:
+                hits.append((self._line_numbers[pos], RANK_TIERS[rank] if coarse else rank, pos))
+        hits.sort()
+        return [self.rows[pos] for _, _, pos in hits[:limit]]
+
+
+def _planned_specs(plan):
+    """(rank, tier, column, needle) for every rank on a planned column, best first."""
+    return [
+        (rank, kind, col, needle)
+        for kind, tier in TIERS
+        for rank, col, needle in tier
+        if col in plan.columns
+    ]
+
+
+def can_refine(previous, current):
+    """True when every match of query ``current`` is a substring match of ``previous``.
+
+    Both are ``(cleaned, normalized, plan)``; the plans must probe the same
+    columns and each of the earlier needles must occur in the new one.
+    """
+    prev_cleaned, prev_normalized, prev_plan = previous
+    cleaned, normalized, plan = current
+    return (
+        bool(prev_normalized)
+        and prev_plan.columns == plan.columns
+        and fold(prev_cleaned) in fold(cleaned)
+        and fold(prev_normalized) in fold(normalized)
+    )
+
+
+def _build_lexicon_index():
+    index = LexiconIndex.from_session(db.session)
+    logger.info(f"Built lexicon index over {len(index)} rows")
+    return index
+
+
+corpus.register(INDEX_NAME, _build_lexicon_index)
+
+
+def get_lexicon_index():
+    """Return the current app's index, building it on first use."""
+    return corpus.get(INDEX_NAME)
+
+
+def _build_speaker_lines():
+    by_speaker = {}
+    for line_number, speaker in db.session.query(FullText.line_number, FullText.speaker):
+        if speaker:
+            by_speaker.setdefault(speaker.casefold(), set()).add(line_number)
+    return {speaker: frozenset(lines) for speaker, lines in by_speaker.items()}
+
+
+corpus.register(SPEAKER_LINES_NAME, _build_speaker_lines)
+
+
+def get_speaker_lines(speaker):
+    """Line numbers spoken by ``speaker`` (case-insensitive); empty if unknown."""
+    return corpus.get(SPEAKER_LINES_NAME).get(speaker.casefold(), frozenset())
@@ -6,6 +6,7 @@ def create_database(db_name='backend/database/antigone.db'):
     cursor = conn.cursor()
 
     # Drop tables if they exist
+    cursor.execute('DROP TABLE IF EXISTS lemma_search')
     cursor.execute('DROP TABLE IF EXISTS lemma_data')
     cursor.execute('DROP TABLE IF EXISTS lemma_definitions')
     cursor.execute('DROP TABLE IF EXISTS full_text')
@@ -79,6 +80,35 @@ def insert_data(wordList_csv, defList_csv, lines_csv, db_name='backend/database/
     conn.commit()
     conn.close()
 
+def create_search_index(db_name='backend/database/antigone.db'):
+    # Trigram FTS5 index over the searchable lemma_data columns; serves the
+    # substring ("contains") search tier without LIKE '%x%' table scans.
+    # It is external content keyed on lemma_data's rowid with no sync
+    # triggers, so run this again after any change to lemma_data (or a
+    # VACUUM). The app compares its rowids with lemma_data's at startup and
+    # falls back to an in-memory scan when they differ.
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+
+    cursor.execute('DROP TABLE IF EXISTS lemma_search')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE lemma_search USING fts5(
+            norm_form,
+            normalized,
+            form_eng,
+            norm_form_eng,
+            full_eng,
+            eng_lemma,
+            content='lemma_data',
+            content_rowid='rowid',
+            tokenize='trigram'
+        )
+    ''')
+    cursor.execute("INSERT INTO lemma_search(lemma_search) VALUES('rebuild')")
+
+    conn.commit()
+    conn.close()
+
 def check_duplicates(file_path):
     # Load the CSV file into a DataFrame
     df = pd.read_csv(file_path)
@@ -96,4 +126,5 @@ def check_duplicates(file_path):
 if __name__ == "__main__":
     create_database()
     insert_data("backend/database/csv/wordList.csv", "backend/database/csv/defList.csv", "backend/database/csv/lines.csv")
+    create_search_index()
     print("Data import complete.")
\ No newline at end of file
@@ -1,7 +1,22 @@
 import csv
-from unicodedata import normalize, category
+import os
+import sys
 import xml.etree.ElementTree as ET
 
+# Share the app's normalization tables (backend/ on the path)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from app.normalization import grk_to_eng as _grk_to_eng, strip_diacritics  # noqa: E402
+
+
+def strip_accents(s):
+    # Ingest keeps apostrophes (elided forms), unlike the app's search form
+    return strip_diacritics(s)
+
+
+def grk_to_eng(word):
+    # Characters with no Beta Code form are dropped from the stored columns
+    return _grk_to_eng(word, drop_unknown=True)
+
 
 
 def xml_parse(file):
@@ -47,12 +62,6 @@ def xml_parse(file):
 
 
 
-# Stack Overflow: https://stackoverflow.com/questions/517923/what-is-the-best-way-to-remove-accents-normalize-in-a-python-unicode-string
-def strip_accents(s):
-   return ''.join(c for c in normalize('NFD', s)
-        if category(c) != 'Mn')
-
-
 def csv_write(wordList, fname):
     filepath = f"backend/database/csv/{fname}.csv"
     with open(filepath, 'w', encoding='utf-8', newline='') as csvfile:
@@ -73,65 +82,6 @@ def hash_word(eng_lemma):
     return hash
 
 
-def grk_to_eng(word):
-
-    word_dict = {
-        'α': 'a', 'ἁ': 'a(', 'ἀ': 'a)', 'ἂ': 'a)\\', 'ἃ': 'a(\\', 'ἄ': 'a)/', 'ἅ': 'a(/', 'ἆ': 'a)=' , 'ἇ': 'a(=', 
-        'ά': 'a/', 'ὰ': 'a\\', 'ᾶ': 'a=', 'ᾳ': 'a|', 'ᾷ': 'a|=', 'ᾴ': 'a|/', 'ᾲ': 'a|\\', 'ᾱ': 'a=', 'ᾰ': 'a', 'ά':'a/',
-        'β': 'b', 'γ': 'g', 'δ': 'd', 
-        'ε': 'e', 'ἐ': 'e)', 'ἑ': 'e(', 'έ': 'e/', 'ὲ': 'e\\', 
-        'ἔ': 'e)/', 'ἕ': 'e(/', 'ἒ': 'e)\\', 'ἓ': 'e(\\', 
-        'ζ': 'z', 
-        'η': 'h', 'ἡ': 'h(', 'ἠ': 'h)', 'ἤ': 'h)/', 'ἥ': 'h(/', 'ἦ': 'h)=', 'ἧ': 'h(=',  
-        'ή': 'h/', 'ὴ': 'h\\', 'ῆ': 'h=', 'ῃ': 'h|', 'ῄ': 'h|/', 'ῂ': 'h|\\', 'ῇ': 'h|=',
-        'θ': 'q', 
-        'ι': 'i', 'ἰ': 'i)', 'ἱ': 'i(', 'ἲ': 'i)\\', 'ἳ': 'i(\\', 'ἴ': 'i)/', 'ἵ': 'i(/', 'ἶ': 'i)=', 'ἷ': 'i(=',  
-        'ί': 'i/', 'ὶ': 'i\\', 'ῖ': 'i=', 'ϊ': 'i+', 'ΐ': 'i+/', 'ῒ': 'i+\\', 'ῗ': 'i+=', 
-        'κ': 'k', 'λ': 'l', 'μ': 'm', 'ν': 'n',
-        'ξ': 'c', 
-        'ο': 'o', 'ὀ': 'o)', 'ὁ': 'o(', 'ὄ': 'o)/', 'ὅ': 'o(/', 'ὂ': 'o)\\', 'ὃ': 'o(\\',  
-        'ό': 'o/', 'ὸ': 'o\\', 
-        'π': 'p', 
-        'ρ': 'r', 'ῤ': 'r)', 'ῥ': 'r(', 
-        'σ': 's', 'ς': 's', 'τ': 't', 
-        'υ': 'u', 'ὐ': 'u)', 'ὑ': 'u(', 'ὒ': 'u)\\', 'ὓ': 'u(\\', 'ὔ': 'u)/', 'ὕ': 'u(/', 'ὖ': 'u)=', 'ὗ': 'u(=',  
-        'ύ': 'u/', 'ὺ': 'u\\', 'ῦ': 'u=', 'ϋ': 'u+', 'ΰ': 'u+/', 'ῢ': 'u+\\', 'ῧ': 'u+=', 
-        'φ': 'f', 'χ': 'x', 'ψ': 'Y', 
-        'ω': 'w', 'ὠ': 'w)', 'ὡ': 'w(', 'ὤ': 'w)/', 'ὥ': 'w(/', 'ὦ': 'w)=', 'ὧ': 'w(=', 'ώ': 'w/',
-        'ώ': 'w/', 'ὼ': 'w\\', 'ῶ': 'w=', 'ῳ': 'w|', 'ῴ': 'w|/', 'ῲ': 'w|\\', 'ῷ': 'w|=', 
-
-        # Capital letters 
-        'Α': 'A', 'Ἀ': 'A)', 'Ἁ': 'A(', 'Ἄ': 'A)/', 'Ἅ': 'A(/', 'Ἆ': 'A(=', 'Ἇ': 'A)=', 'Ά': 'A/', 'Ᾱ': 'A=', 'Ᾰ': 'A', 
-        'Β': 'B', 'Γ': 'G', 'Δ': 'D', 
-        'Ε': 'E', 'Ἐ': 'E)', 'Ἑ': 'E(', 'Ἔ': 'E)/', 'Ἕ': 'E(/', 'Ἒ': 'E)\\', 'Ἓ': 'E(\\', 'Έ': 'E/', 
-        'Ζ': 'Z', 
-        'Η': 'H', 'Ἠ': 'H)', 'Ἡ': 'H(', 'Ἤ': 'H)/', 'Ἥ': 'H(/', 'Ἦ': 'H)=', 'Ἧ': 'H(=', 'Ή': 'H/', 'ῌ': 'H|', 'Ή': 'H|/', 
-        'Θ': 'Q)', 
-        'Ι': 'I', 'Ἰ': 'I)', 'Ἱ': 'I(', 'Ἴ': 'I)/', 'Ἵ': 'I(/', 'Ἶ': 'I)=', 'Ἷ': 'I(=', 'Ί': 'I/', 'Ῑ': 'I=', 'Ῐ': 'I', 
-        'Κ': 'K', 'Λ': 'L', 'Μ': 'M', 'Ν': 'N', 
-        'Ξ': 'C', 
-        'Ο': 'O', 'Ὀ': 'O)', 'Ὁ': 'O(', 'Ὄ': 'O)/', 'Ὅ': 'O(/', 'Ό': 'O/', 
-        'Π': 'P', 
-        'Ρ': 'R', 'Ῥ': 'R(', 
-        'Σ': 'S', 'Τ': 'T', 
-        'Υ': 'U', 'Ὑ': 'U(', 'Ὕ': 'U(/', 'Ὓ': 'U(\\', 'Ὗ': 'U(=', 'Ύ': 'U/', 'Ῡ': 'U=', 'Ῠ': 'U', 
-        'Φ': 'F', 'Χ': 'X', 'Ψ': 'Y', 
-        'Ω': 'W', 'Ὠ': 'W)', 'Ὡ': 'W(', 'Ὤ': 'W)/', 'Ὥ': 'W(/', 'Ὦ': 'W)=', 'Ὧ': 'W(=', 'Ώ': 'W/', 'ῼ': 'W|', 'Ώ': 'W|/' 
-    }
-
-
-
-
-    new_word = ''
-    for char in word:
-        if char in word_dict:
-            new_word += word_dict[char]
-        else:
-            assert f"Character {char} not found in dictionary"
-
-    return new_word
-
-
 def noun_case(lemma):
     CASE_ENDINGS = {
         "feminine": {
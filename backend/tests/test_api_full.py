@@ -1,5 +1,6 @@
 """Integration tests for all `/AntigoneApp/api` blueprint routes."""
 
+import gzip
 import json
 
 
@@ -17,7 +18,7 @@ def test_metadata(client):
     r = client.get(f"{API}/metadata")
     assert r.status_code == 200
     data = r.get_json()
-    assert data["apiVersion"] == "1.1.0"
+    assert data["apiVersion"] == "1.2.0"
     assert data["firstPage"] == 1
     assert data["lastPage"] == 123
     assert data["linesPerPage"] == 11
@@ -59,6 +60,15 @@ def test_read_page_valid(client):
     assert lines[-1]["lineNum"] == 11
 
 
+def test_read_page_gzip_matches_identity(client):
+    plain = client.get(f"{API}/read/1")
+    r = client.get(f"{API}/read/1", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert r.headers["Content-Length"] == str(len(r.data))
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert gzip.decompress(r.data) == plain.data
+
+
 def test_read_page_invalid_low(client):
     r = client.get(f"{API}/read/0")
     assert r.status_code == 400
@@ -162,6 +172,23 @@ def test_search_word_mode_returns_array(client):
     assert meta.get("lemma") == "πολις"
 
 
+def test_search_word_lowercase_beta_code_proper_name(app, client):
+    from app import db
+    from app.models import LemmaData
+
+    with app.app_context():
+        db.session.add(LemmaData(
+            lemma_id=500, line_number=41, lemma="Κρέων", form="Κρέων", postag="n-s---mn-",
+            normalized="Κρεων", norm_form="Κρεων", full_eng="Kre/wn", eng_lemma="Krewn",
+            form_eng="Kre/wn", norm_form_eng="Krewn", urn="",
+        ))
+        db.session.commit()
+
+    for q in ("kre/wn", "re/w", "/wn"):
+        data = client.get(f"{API}/search", query_string={"mode": "word", "q": q}).get_json()
+        assert [entry[0]["lemma_id"] for entry in data] == [500], q
+
+
 def test_search_word_short_query_exact_before_substring(client):
     """Tier 1 (form_eng == 'o') must appear before tier-3 substring matches for q=o."""
     r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o"})
@@ -173,6 +200,49 @@ def test_search_word_short_query_exact_before_substring(client):
     assert line_numbers.index(10) < line_numbers.index(20)
 
 
+def test_search_word_page_scoped(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "page": 1})
+    assert r.status_code == 200
+    assert [e[0]["line_number"] for e in r.get_json()] == [10]
+
+
+def test_search_word_line_range_ordered_by_line(client):
+    r = client.get(
+        f"{API}/search",
+        query_string={"mode": "word", "q": "o", "start_line": 15, "end_line": 35},
+    )
+    assert r.status_code == 200
+    assert [e[0]["line_number"] for e in r.get_json()] == [20, 30]
+
+
+def test_search_invalid_line_scope_returns_empty(client):
+    for params in ({"page": 999}, {"start_line": "x"}, {"start_line": 30, "end_line": 20}):
+        r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", **params})
+        assert r.status_code == 200
+        assert r.get_json() == []
+
+
+def test_search_suggestions_when_nothing_matches(client):
+    r = client.get(
+        f"{API}/search",
+        query_string={"mode": "word", "q": "polsi", "suggest": "1"},
+    )
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["results"] == []
+    assert body["suggestions"] == ["polis"]
+
+
+def test_search_suggest_wraps_non_empty_results(client):
+    r = client.get(
+        f"{API}/search",
+        query_string={"mode": "word", "q": "polis", "suggest": "true"},
+    )
+    body = r.get_json()
+    assert len(body["results"]) >= 1
+    assert body["suggestions"] == []
+
+
 def test_search_definition_exact(client):
     r = client.get(
         f"{API}/search",
@@ -185,6 +255,28 @@ def test_search_definition_exact(client):
     assert "πολις" in lemmas
 
 
+def test_suggest_prefix_completions(client):
+    r = client.get(f"{API}/suggest", query_string={"q": "pol"})
+    assert r.status_code == 200
+    assert r.get_json() == [{"text": "πολις", "lemma": "πολις", "count": 1}]
+
+
+def test_suggest_empty_query(client):
+    r = client.get(f"{API}/suggest", query_string={"q": "  "})
+    assert r.status_code == 200
+    assert r.get_json() == []
+
+
+def test_search_definition_lists_each_occurrence_once(client):
+    """Two matching definitions of one lemma still yield one entry per line."""
+    r = client.get(
+        f"{API}/search",
+        query_string={"mode": "definition", "q": "unique_exact_def_match"},
+    )
+    keys = [(e[0]["lemma_id"], e[0]["line_number"]) for e in r.get_json()]
+    assert keys == [(300, 30)]
+
+
 def test_word_details(client):
     r = client.get(f"{API}/word-details/πολις")
     assert r.status_code == 200
@@ -197,3 +289,247 @@ def test_word_details_empty_unknown(client):
     assert r.status_code == 200
     data = r.get_json()
     assert data == []
+
+
+def test_search_cursor_pages_through_all_hits(client):
+    params = {"mode": "word", "q": "o", "limit": 2}
+    first = client.get(f"{API}/search", query_string=params).get_json()
+    assert [e[0]["line_number"] for e in first["results"]] == [10, 20]
+    assert first["next_cursor"]
+
+    second = client.get(
+        f"{API}/search", query_string={**params, "cursor": first["next_cursor"]}
+    ).get_json()
+    assert [e[0]["line_number"] for e in second["results"]] == [30]
+    assert second["next_cursor"] is None
+
+
+def test_search_group_by_lemma(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "group": "lemma"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert [g["lemma_id"] for g in body["results"]] == [100, 200, 300]
+    polis = body["results"][2]
+    assert polis["count"] == 1 and polis["line_numbers"] == [30]
+    assert polis["definitions"][0]["short_def"] == "unique_exact_def_match"
+    assert body["next_cursor"] is None
+
+
+
+def test_search_group_pages_rank_hits_once(client, monkeypatch):
+    from app import routes
+
+    calls = []
+    real = routes.find_word_rows
+    monkeypatch.setattr(routes, "find_word_rows", lambda *a, **kw: calls.append(kw["limit"]) or real(*a, **kw))
+    params = {"mode": "word", "q": "o", "group": "lemma", "limit": 1}
+    seen, cursor = [], None
+    while True:
+        body = client.get(f"{API}/search", query_string={**params, **({"cursor": cursor} if cursor else {})}).get_json()
+        seen += [g["lemma_id"] for g in body["results"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [100, 200, 300]
+    assert calls == [None]
+
+def test_search_invalid_cursor_returns_empty_page(client):
+    for params in ({"cursor": "not-a-cursor"}, {"limit": "0"}, {"limit": "x"}):
+        r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", **params})
+        assert r.status_code == 200
+        assert r.get_json() == {"results": [], "next_cursor": None}
+
+
+def test_search_normalized_format(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "format": "normalized"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert [o[:2] for o in body["occurrences"]] == [[100, 10], [200, 20], [300, 30]]
+    assert body["lemmas"]["300"]["definitions"][0]["short_def"] == "unique_exact_def_match"
+    assert body["postags"]["n-s---n--"]["7"] == "neuter"
+    assert body["speakers"]["10"] == "TestSpeaker"
+
+
+def test_search_normalized_matches_default_payload(client):
+    default = client.get(f"{API}/search", query_string={"mode": "word", "q": "o"}).get_json()
+    body = client.get(
+        f"{API}/word-details/o", query_string={"format": "normalized"}
+    ).get_json()
+    assert len(body["occurrences"]) == len(default)
+    for (lemma_id, line, form, postag), (meta, case, *defs) in zip(body["occurrences"], default):
+        assert (lemma_id, line, form, postag) == (meta["lemma_id"], meta["line_number"], meta["form"], meta["postag"])
+        assert body["postags"][postag] == case["case"]
+        assert body["speakers"][str(line)] == meta["speaker"]
+        assert body["lemmas"][str(lemma_id)]["definitions"] == (defs[0]["definitions"] if defs else [])
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_search_stream_flushes_tiers_in_order(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "stream": "1"})
+    assert r.status_code == 200
+    assert r.mimetype == "application/x-ndjson"
+    chunks = _ndjson(r)
+    assert [c.get("tier") for c in chunks[:-1]] == ["exact", "contains"]
+    assert [e[0]["line_number"] for e in chunks[0]["results"]] == [10]
+    assert [e[0]["line_number"] for e in chunks[1]["results"]] == [20, 30]
+    assert chunks[-1] == {"done": True, "count": 3}
+
+
+def test_search_stream_fuzzy_tier_when_nothing_matches(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "polsi", "stream": "1"})
+    assert _ndjson(r) == [
+        {"tier": "fuzzy", "suggestions": ["polis"]},
+        {"done": True, "count": 0},
+    ]
+
+
+def test_search_incremental_reuses_session_token(client):
+    params = {"mode": "word", "q": "po", "incremental": "1"}
+    first = client.get(f"{API}/search", query_string=params).get_json()
+    assert first["token"]
+    assert [e[0]["lemma_id"] for e in first["results"]] == [300]
+
+    second = client.get(
+        f"{API}/search", query_string={**params, "q": "pol", "prev": first["token"]}
+    ).get_json()
+    assert second["token"] == first["token"]
+    assert [e[0]["lemma_id"] for e in second["results"]] == [300]
+
+
+
+def test_search_morphology_filters_word_results(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "gender": "neuter"})
+    assert [e[0]["line_number"] for e in r.get_json()] == [10, 20, 30]
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "pos": "verb"})
+    assert r.get_json() == []
+
+
+def test_search_morphology_only_in_line_order(client):
+    r = client.get(
+        f"{API}/search",
+        query_string={"pos": "noun", "number": "sing", "speaker": "TestSpeaker"},
+    )
+    assert r.status_code == 200
+    assert [e[0]["line_number"] for e in r.get_json()] == [10, 20, 30, 40]
+
+
+def test_search_invalid_morphology_returns_empty(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "case": "ablative"})
+    assert r.status_code == 200
+    assert r.get_json() == []
+
+
+def test_read_page_etag_answers_304(client):
+    first = client.get(f"{API}/read/1")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "public, max-age=86400"
+    again = client.get(f"{API}/read/1", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+    other = client.get(f"{API}/read/2", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+
+
+def test_etag_changes_with_build(app, client):
+    etag = client.get(f"{API}/read/1").headers["ETag"]
+    app.extensions["http_cache"]["build"] = "next-release"
+    r = client.get(f"{API}/read/1", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+
+def test_etag_differs_per_content_encoding(client):
+    plain = client.get(f"{API}/read/1").headers["ETag"]
+    gz = client.get(f"{API}/read/1", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["ETag"] != plain
+    again = client.get(
+        f"{API}/read/1", headers={"Accept-Encoding": "gzip", "If-None-Match": gz.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_cache_control_configurable_per_endpoint(app, client):
+    assert client.get(f"{API}/suggest", query_string={"q": "po"}).headers["Cache-Control"] == "public, max-age=3600"
+    app.config["CACHE_CONTROL"] = {"api.suggest": "no-cache"}
+    assert client.get(f"{API}/suggest", query_string={"q": "po"}).headers["Cache-Control"] == "no-cache"
+
+
+def test_incremental_search_is_not_cacheable(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "po", "incremental": "1"})
+    assert r.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in r.headers
+
+
+def test_errors_carry_no_etag(client):
+    r = client.get(f"{API}/read/0")
+    assert r.status_code == 400
+    assert "ETag" not in r.headers
+
+
+def test_read_batch_pages_keyed_by_page(client):
+    r = client.get(f"{API}/read", query_string={"pages": "1-2"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert sorted(body) == ["1", "2"]
+    assert body["1"] == client.get(f"{API}/read/1").get_json()
+    assert [x["lineNum"] for x in body["2"]] == list(range(12, 23))
+
+
+def test_read_batch_with_speaker_and_bad_pages(client):
+    body = client.get(f"{API}/read", query_string={"pages": "1,3", "speaker": "chorus"}).get_json()
+    assert [x["lineNum"] for x in body["1"]] == [1, 3, 5, 7, 9, 11]
+    assert client.get(f"{API}/read", query_string={"pages": "0-2"}).status_code == 400
+    assert client.get(f"{API}/read", query_string={"pages": "1-30"}).status_code == 400
+    assert client.get(f"{API}/read").status_code == 400
+
+
+def test_lines_set_keyed_by_span(client):
+    r = client.get(f"{API}/lines", query_string={"set": "1, 5,9-11"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert sorted(body) == ["1", "5", "9-11"]
+    assert body["5"] == client.get(f"{API}/lines/5").get_json()
+    assert [x["lineNum"] for x in body["9-11"]] == [9, 10, 11]
+    assert client.get(f"{API}/lines", query_string={"set": "5-1"}).status_code == 400
+    assert client.get(f"{API}/lines", query_string={"set": "x"}).status_code == 400
+
+
+def test_search_error_result_gets_no_validator(client, monkeypatch):
+    from app import routes
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(routes, "_run_search", fail)
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "πολις"})
+    assert r.status_code == 200 and r.get_json() == []
+    assert "ETag" not in r.headers
+    assert r.headers["Cache-Control"] == "no-store"
+
+
+def test_search_stream_gets_no_validator(client):
+    r = client.get(f"{API}/search", query_string={"mode": "word", "q": "o", "stream": "1"})
+    assert "ETag" not in r.headers
+    assert r.headers["Cache-Control"] == "no-store"
+
+
+def test_query_etag_is_weak(client):
+    r = client.get(f"{API}/query", query_string={"q": "lemma:πολις"})
+    assert r.headers["ETag"].startswith('W/"')
+    again = client.get(f"{API}/query", query_string={"q": "lemma:πολις"},
+                       headers={"If-None-Match": r.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == r.headers["ETag"]
+
+
+def test_lines_set_rejects_overlaps_and_oversized_batches(client):
+    for bad in ("1-10,5", "3,3", "1-20,10-30", "1-1353", "1-200,300-400"):
+        r = client.get(f"{API}/lines", query_string={"set": bad})
+        assert r.status_code == 400, bad
+        assert "error" in r.get_json()
+    assert client.get(f"{API}/lines", query_string={"set": "1-10,11-20"}).status_code == 200
+    assert client.get(f"{API}/read", query_string={"pages": "1-3,2"}).status_code == 400
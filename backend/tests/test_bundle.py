@@ -0,0 +1,76 @@
+"""Tests for the offline corpus bundle and its deltas."""
+
+import gzip
+import json
+
+from app import db
+from app.bundle import table_delta
+from app.corpus import refresh_content_version
+from app.models import FullText
+
+API = "/AntigoneApp/api"
+
+
+def test_table_delta_upserts_and_deletes_by_key():
+    old = {"columns": ["id", "text"], "key": ["id"], "rows": [[1, "a"], [2, "b"], [3, "c"]]}
+    new = {"columns": ["id", "text"], "key": ["id"], "rows": [[1, "a"], [2, "B"], [4, "d"]]}
+    delta = table_delta(old, new)
+    assert delta["upsert"] == [[2, "B"], [4, "d"]]
+    assert delta["delete"] == [[3]]
+    renamed = {"columns": ["id", "body"], "key": ["id"], "rows": [[1, "a"]]}
+    assert table_delta(old, renamed)["upsert"] == [[1, "a"]]
+
+
+def test_bundle_snapshot_and_delta(app, client, tmp_path):
+    app.config["BUNDLE_DIR"] = str(tmp_path)
+    r = client.get(f"{API}/bundle", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    bundle = json.loads(gzip.decompress(r.data))
+    full_text = bundle["tables"]["full_text"]
+    assert full_text["key"] == ["line_number"]
+    assert len(full_text["rows"]) == 44
+    assert set(bundle["tables"]) == {"full_text", "lemma_data", "lemma_definitions"}
+    assert "n-s---n--" in bundle["postags"]
+
+    unchanged = client.get(f"{API}/bundle/delta", query_string={"since": bundle["version"]}).get_json()
+    assert all(not t["upsert"] and not t["delete"] for t in unchanged["tables"].values())
+
+    with app.app_context():
+        db.session.get(FullText, 3).line_text = "changed"
+        db.session.delete(db.session.get(FullText, 44))
+        db.session.commit()
+        refresh_content_version()
+
+    delta = client.get(f"{API}/bundle/delta", query_string={"since": bundle["version"]}).get_json()
+    assert delta["since"] == bundle["version"] and delta["version"] != bundle["version"]
+    lines = delta["tables"]["full_text"]
+    assert [row[0] for row in lines["upsert"]] == [3]
+    assert lines["delete"] == [[44]]
+    assert not delta["tables"]["lemma_data"]["upsert"]
+
+
+def test_bundle_delta_unknown_or_invalid_version(client, tmp_path, app):
+    app.config["BUNDLE_DIR"] = str(tmp_path)
+    assert client.get(f"{API}/bundle/delta", query_string={"since": "0123456789abcdef"}).status_code == 410
+    assert client.get(f"{API}/bundle/delta", query_string={"since": "../etc"}).status_code == 400
+
+
+def test_bundle_is_built_lazily_and_delta_served_from_cache(app, client, tmp_path, monkeypatch):
+    from app import bundle, corpus, routes
+
+    app.config.update(BUNDLE_DIR=str(tmp_path), CORPUS_EAGER=True)
+    corpus.init_app(app)
+    built = app.extensions[corpus.EXTENSION_KEY]["built"]
+    assert "line_store" in built and bundle.INDEX_NAME not in built
+
+    with app.app_context():
+        version = corpus.get_content_version()
+        assert bundle.has_snapshot(version)
+        assert not bundle.has_snapshot("0123456789abcdef")
+        assert not bundle.has_snapshot("../etc/passwd")
+
+    loads = []
+    monkeypatch.setattr(routes, "load_snapshot", lambda v: loads.append(v) or bundle.load_snapshot(v))
+    for _ in range(3):
+        assert client.get(f"{API}/bundle/delta", query_string={"since": version}).status_code == 200
+    assert loads == [version]
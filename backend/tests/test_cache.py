@@ -0,0 +1,54 @@
+"""Tests for the versioned response cache."""
+
+from app.cache import ResponseCache
+
+API = "/AntigoneApp/api"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=10, ttl=5, clock=clock)
+    cache.put("k", b"v")
+    clock.now = 4.9
+    assert cache.get("k") == b"v"
+    clock.now = 5.0
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_search_served_from_cache_on_repeat(client):
+    params = {"mode": "word", "q": "πολις", "speaker": "TestSpeaker"}
+    first = client.get(f"{API}/search", query_string=params)
+    second = client.get(f"{API}/search", query_string={**params, "speaker": "testspeaker"})
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.get_data() == second.get_data()
+
+
+def test_word_details_shares_unscoped_search_entry(client):
+    client.get(f"{API}/search", query_string={"mode": "word", "q": "πολις"})
+    r = client.get(f"{API}/word-details/πολις")
+    assert r.headers["X-Cache"] == "HIT"
+    stats = client.get(f"{API}/cache-stats").get_json()
+    assert stats["hits"] == 1 and stats["misses"] == 1
@@ -0,0 +1,25 @@
+"""Unit tests for the typeahead completion trie."""
+
+from app.completion_index import CompletionTrie
+
+
+def _trie():
+    return CompletionTrie([
+        ("λόγος", "λόγος", 12, ["λογος", "logos", "lo/gos"]),
+        ("λόγοις", "λόγος", 3, ["λογοις", "logois", "lo/gois"]),
+        ("λόγχη", "λόγχη", 2, ["λογχη", "logxh", "lo/gxh"]),
+        ("λόγος", "λόγος", 4, ["λογος"]),
+    ], keep=2)
+
+
+def test_completions_ranked_by_frequency_and_truncated():
+    trie = _trie()
+    assert trie.complete("λογ") == [("λόγος", "λόγος", 12), ("λόγοις", "λόγος", 3)]
+    assert trie.complete("λογχ") == [("λόγχη", "λόγχη", 2)]
+
+
+def test_beta_code_keys_with_and_without_accents():
+    trie = _trie()
+    assert trie.complete("LOG", limit=1) == [("λόγος", "λόγος", 12)]
+    assert trie.complete("lo/gx") == [("λόγχη", "λόγχη", 2)]
+    assert trie.complete("zz") == []
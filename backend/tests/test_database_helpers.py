@@ -1,6 +1,22 @@
 """Direct tests for database_helpers (requires app + DB context)."""
 
-from app.database_helpers import get_word, lookup_word_details
+from sqlalchemy import text
+
+from app import db
+from app.corpus import refresh_content_version
+from app.database_helpers import (
+    find_word_rows,
+    get_defs_for_lemmas,
+    get_speakers,
+    get_word,
+    get_word_defs,
+    group_rows_by_lemma,
+    lemma_groups_payload,
+    lookup_word_details,
+    refine_word_rows,
+)
+from app.models import LemmaData
+from app.search_index import FtsSubstringSource, LexiconIndex
 
 
 def test_lookup_word_details_whitespace_only_returns_empty(app):
@@ -14,3 +30,97 @@ def test_get_word_first_form_by_lemma_id(app):
         form = get_word(300)
         assert form == "πολις"
 
+
+def test_batched_speakers_and_defs_match_single_lookups(app):
+    with app.app_context():
+        assert get_speakers([10, 11, 9999]) == {10: "TestSpeaker", 11: "Chorus"}
+        defs = get_defs_for_lemmas([300, 200, 100])
+        assert defs[300] == get_word_defs(300)
+        assert defs[200] == get_word_defs(200)
+        assert 100 not in defs
+        assert get_speakers([]) == {} and get_defs_for_lemmas([]) == {}
+
+
+def test_lookup_word_details_speaker_scoped(app):
+    with app.app_context():
+        assert [e[0]["line_number"] for e in lookup_word_details("o", speaker="testspeaker")] == [10, 20, 30]
+        assert lookup_word_details("o", speaker="Nobody") == []
+
+
+def test_lemma_groups_count_every_occurrence(app):
+    with app.app_context():
+        for line in (33, 31):
+            db.session.add(LemmaData(
+                lemma_id=300, line_number=line, lemma="πολις", form="πολεως",
+                postag="n-s---g--", normalized="πολις", norm_form="πολεως",
+                full_eng="", eng_lemma="polis", form_eng="polews",
+                norm_form_eng="polews", urn="",
+            ))
+        db.session.commit()
+        refresh_content_version()
+
+        groups = group_rows_by_lemma(find_word_rows("πολις", limit=None))
+        assert [lemma_id for lemma_id, _ in groups] == [300]
+        [entry] = lemma_groups_payload(groups, max_lines=2)
+        assert entry["count"] == 3
+        assert entry["line_numbers"] == [30, 31]
+        assert set(entry["forms"]) == {"πολις", "πολεως"}
+
+
+def test_refine_word_rows_narrows_previous_matches(app):
+    with app.app_context():
+        rows, token, refined = refine_word_rows("o")
+        assert [r.lemma_id for r in rows] == [100, 200, 300] and not refined
+        rows, same, refined = refine_word_rows("ol", token=token)
+        assert same == token and refined
+        assert [r.lemma_id for r in rows] == [300]
+        # Widening the query starts over
+        rows, _, refined = refine_word_rows("l", token=token)
+        assert not refined
+
+
+def test_stale_fts_table_falls_back_to_memory_scan(app):
+    with app.app_context():
+        db.session.execute(text(
+            "CREATE VIRTUAL TABLE lemma_search USING fts5(norm_form, normalized, form_eng, "
+            "norm_form_eng, full_eng, eng_lemma, content='lemma_data', content_rowid='rowid', "
+            "tokenize='trigram')"
+        ))
+        db.session.execute(text("INSERT INTO lemma_search(lemma_search) VALUES('rebuild')"))
+        db.session.commit()
+        assert FtsSubstringSource.consistent(db.session)
+        assert LexiconIndex.from_session(db.session).substring_source is not None
+
+        # Re-inserting a row gives it a new rowid the index does not know
+        db.session.execute(text("CREATE TEMP TABLE moved AS SELECT * FROM lemma_data WHERE lemma_id = 300"))
+        db.session.execute(text("DELETE FROM lemma_data WHERE lemma_id = 300"))
+        db.session.execute(text("INSERT INTO lemma_data SELECT * FROM moved"))
+        db.session.commit()
+        assert not FtsSubstringSource.consistent(db.session)
+        index = LexiconIndex.from_session(db.session)
+        assert index.substring_source is None
+        assert [r.lemma_id for r in index.search("ολι", "ολι", limit=None)] == [300]
+
+
+def test_fts_check_works_on_read_only_database(tmp_path):
+    import sqlite3
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    path = tmp_path / "ro.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE lemma_data (norm_form, normalized, form_eng, norm_form_eng, full_eng, eng_lemma)")
+    conn.executemany("INSERT INTO lemma_data VALUES (?, ?, ?, ?, ?, ?)", [("πολις",) * 6, ("λογος",) * 6])
+    conn.execute(
+        "CREATE VIRTUAL TABLE lemma_search USING fts5(norm_form, normalized, form_eng, norm_form_eng, "
+        "full_eng, eng_lemma, content='lemma_data', content_rowid='rowid', tokenize='trigram')"
+    )
+    conn.execute("INSERT INTO lemma_search(lemma_search) VALUES('rebuild')")
+    conn.commit()
+    conn.close()
+
+    engine = create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    with Session(engine) as session:
+        assert FtsSubstringSource.consistent(session)
+    engine.dispose()
@@ -0,0 +1,29 @@
+"""Unit tests for the BM25 definition index."""
+
+from app.definition_index import DefinitionIndex, stem, tokenize
+
+
+def test_light_stemming_merges_inflections():
+    assert stem("loves") == stem("loved") == stem("love") == stem("loving")
+    assert stem("cities") == stem("city")
+    assert tokenize("to love") == [stem("love")]
+    assert tokenize("the") == ["the"]
+
+
+def test_intersection_ranks_lemmas_with_all_terms():
+    index = DefinitionIndex([
+        (1, "love"),
+        (2, "love of the city"),
+        (3, "city, state"),
+    ])
+    assert [lemma_id for lemma_id, _ in index.search("city loves")] == [2]
+    # No lemma has both terms: fall back to any of them
+    assert {lemma_id for lemma_id, _ in index.search("love state")} == {1, 2, 3}
+
+
+def test_exact_definition_ranks_first():
+    index = DefinitionIndex([
+        (1, "brother, brother"),
+        (2, "brother's"),
+    ])
+    assert [lemma_id for lemma_id, _ in index.search("Brother's")] == [2, 1]
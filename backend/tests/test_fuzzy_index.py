@@ -0,0 +1,23 @@
+"""Unit tests for the SymSpell-style fuzzy index."""
+
+from app.fuzzy_index import FuzzyIndex, edit_distance
+
+
+def test_edit_distance_is_bounded():
+    assert edit_distance("logos", "logos", 2) == 0
+    assert edit_distance("logos", "lgos", 2) == 1
+    assert edit_distance("antignoh", "antigonh", 2) == 2
+    assert edit_distance("a", "abcdef", 2) == 3
+
+
+def test_lookup_returns_nearest_distance_by_frequency():
+    index = FuzzyIndex([("λογος", 13), ("λοχος", 1), ("αγος", 4), ("polis", 33)])
+    assert index.lookup("λγος") == [("λογος", 1, 13), ("αγος", 1, 4)]
+    assert index.lookup("polsi") == [("polis", 2, 33)]
+    assert index.lookup("zzzz") == []
+
+
+def test_case_and_final_sigma_count_as_distance_zero():
+    index = FuzzyIndex([("Αντιγονη", 4), ("λογος", 2)])
+    assert index.lookup("αντιγονη") == [("Αντιγονη", 0, 4)]
+    assert index.lookup("λογοσ") == [("λογος", 0, 2)]
@@ -0,0 +1,29 @@
+"""Tests for the in-memory line store."""
+
+from app.line_store import LineStore
+
+ROWS = [(1, "first", "Ἀντιγόνη"), (2, "second", "Κρέων"), (3, "third", None), (5, "fifth", "Κρέων")]
+
+
+def test_line_and_speaker_lookups():
+    store = LineStore(ROWS)
+    assert len(store) == 4
+    assert store.line(2) == ("second", "Κρέων")
+    assert store.line(4) == (None, None)
+    assert store.line(99) == (None, None)
+    assert store.speaker(1) == "Ἀντιγόνη"
+    assert store.speaker(0) is None
+    assert store.speakers([1, 3, 4, 5]) == {1: "Ἀντιγόνη", 3: None, 5: "Κρέων"}
+
+
+def test_rows_skip_or_fill_missing_lines():
+    store = LineStore(ROWS)
+    assert [line for line, _, _ in store.rows(1, 6)] == [1, 2, 3, 5]
+    assert store.rows(4, 7, missing=True) == [(4, None, None), (5, "fifth", "Κρέων"), (6, None, None), (7, None, None)]
+    assert store.rows(3, 2) == []
+
+
+def test_rows_speaker_filter_is_case_insensitive():
+    store = LineStore(ROWS)
+    assert [line for line, _, _ in store.rows(1, 9, "ΚΡΈΩΝ", missing=True)] == [2, 5]
+    assert store.rows(1, 9, "nobody") == []
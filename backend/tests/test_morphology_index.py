@@ -0,0 +1,46 @@
+"""Unit tests for the postag bitmap index (no database required)."""
+
+import pytest
+
+from app.morphology_index import MorphologyIndex, parse_feature_values, parse_morphology
+from app.search_index import LexiconRow
+
+
+def _row(lemma_id, line_number, postag):
+    return LexiconRow(
+        lemma_id=lemma_id, line_number=line_number, lemma="λ", form="λ", postag=postag,
+        normalized="λ", norm_form="λ", full_eng="", eng_lemma="", form_eng="", norm_form_eng="",
+    )
+
+
+ROWS = [
+    _row(1, 1, "v-sapamg-"),  # aorist participle, genitive
+    _row(2, 2, "v-sppamn-"),  # present participle
+    _row(3, 3, "n-p---mg-"),  # genitive plural noun
+    _row(4, 4, "n-s---fn-"),
+]
+SPEAKERS = {1: "Chorus", 2: "Creon", 3: "Chorus", 4: "Chorus"}
+
+
+def test_feature_values_accept_letters_names_and_prefixes():
+    assert parse_feature_values("case", "g") == {"g"}
+    assert parse_feature_values("case", "Genitive,dat") == {"g", "d"}
+    assert parse_feature_values("tense", "aor") == {"a"}
+    with pytest.raises(ValueError):
+        parse_feature_values("tense", "fu")  # future or future perfect
+    with pytest.raises(ValueError):
+        parse_feature_values("case", "ablative")
+
+
+def test_parse_morphology_ignores_blank_and_other_args():
+    assert parse_morphology({"q": "x", "case": " ", "mood": "part"}) == {"mood": {"p"}}
+    assert parse_morphology({"q": "x"}) is None
+
+
+def test_select_intersects_features_and_speaker():
+    index = MorphologyIndex(ROWS, SPEAKERS)
+    assert index.positions({"tense": {"a"}, "mood": {"p"}}) == {0}
+    assert index.positions({"case": {"g"}, "number": {"p"}}) == {2}
+    assert index.positions({"case": {"g"}}, speaker="chorus") == {0, 2}
+    assert index.positions({"case": {"g", "n"}, "pos": {"n"}}) == {2, 3}
+    assert index.positions({"case": {"d"}}) == frozenset()
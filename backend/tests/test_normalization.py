@@ -0,0 +1,61 @@
+"""Unit tests for the shared normalization tables in app.normalization."""
+
+from unicodedata import category, normalize
+
+from app.normalization import (
+    GREEK_TO_BETA,
+    beta_to_greek,
+    clean_word,
+    grk_to_eng,
+    normalize_query,
+    query_spellings,
+    strip_accents,
+    strip_diacritics,
+)
+
+
+def _reference_strip(s):
+    return ''.join(c for c in normalize('NFD', s) if category(c) != 'Mn')
+
+
+def test_strip_tables_match_nfd_for_every_greek_character():
+    chars = [chr(c) for c in list(range(0x0370, 0x0400)) + list(range(0x1F00, 0x2000))]
+    for char in chars:
+        assert strip_diacritics(char) == _reference_strip(char)
+    word = ''.join(chars)
+    assert strip_diacritics(word) == _reference_strip(word)
+
+
+def test_strip_accents_outside_tables_falls_back():
+    assert strip_diacritics("Ṡé") == _reference_strip("Ṡé")
+    assert strip_accents("ἀλλ'") == "αλλ"
+    assert strip_diacritics("ἀλλ'") == "αλλ'"
+
+
+def test_clean_word():
+    assert clean_word("[ἀλλʼ·") == "ἀλλ"
+    assert clean_word("λόγος;]") == "λόγος"
+    assert clean_word("[[x") == "[x"
+
+
+def test_grk_to_eng_unknown_characters():
+    assert grk_to_eng("Ἀντιγόνη") == "A)ntigo/nh"
+    assert grk_to_eng("λόγος?") == "lo/gos?"
+    assert grk_to_eng("λόγος?", drop_unknown=True) == "lo/gos"
+
+
+def test_beta_to_greek_round_trips_the_forward_table():
+    # The output is NFC, which folds a few duplicate table entries together
+    for greek, beta in GREEK_TO_BETA.items():
+        assert grk_to_eng(beta_to_greek(beta)) == grk_to_eng(normalize('NFC', greek))
+    assert beta_to_greek("lo/gos") == "λόγος"
+    assert beta_to_greek("*)anti/gonh") == "Ἀντίγονη"
+    assert beta_to_greek("qeo/s kai\\") == "θεός καὶ"
+
+
+def test_query_spellings_read_beta_code_as_greek():
+    assert normalize_query("[λόγος.") == ("λόγος", "λογος")
+    assert normalize_query("lo/gos") == ("lo/gos", "lo/gos")
+    assert query_spellings("lo/gos") == [("lo/gos", "lo/gos"), ("λόγος", "λογος")]
+    assert query_spellings("λόγος") == [("λόγος", "λογος")]
+    assert normalize_query("logos") == ("logos", "logos")
@@ -0,0 +1,36 @@
+"""Tests for the pre-rendered reading pages."""
+
+import gzip
+import json
+
+from werkzeug.datastructures import Accept
+
+from app.line_store import LineStore
+from app.page_store import PageStore, RenderedBody
+
+
+def _render(payload):
+    return json.dumps(payload).encode()
+
+
+def test_pages_and_speaker_variants():
+    lines = LineStore([(1, "a", "Chorus"), (2, "b", "Creon"), (12, "c", "Chorus")])
+    store = PageStore(lines, _render)
+    assert json.loads(store.page(1).body) == [
+        {"lineNum": 1, "line_text": "a", "speaker": "Chorus"},
+        {"lineNum": 2, "line_text": "b", "speaker": "Creon"},
+    ]
+    assert [x["lineNum"] for x in json.loads(store.page(1, "CREON").body)] == [2]
+    assert json.loads(store.page(2, "creon").body) == []
+    assert store.page(2, "creon") is store.page(3)
+
+
+def test_negotiate_prefers_smallest_accepted_encoding():
+    body = RenderedBody(_render([{"line_text": "x" * 500}]))
+    encoding, data = body.negotiate(Accept([("gzip", 1)]))
+    assert encoding == "gzip"
+    assert gzip.decompress(data) == body.body
+    assert body.negotiate(Accept([])) == (None, body.body)
+    assert body.negotiate(Accept([("gzip", 0)]))[0] is None
+    tiny = RenderedBody(b"[]")
+    assert tiny.negotiate(Accept([("gzip", 1)])) == (None, b"[]")
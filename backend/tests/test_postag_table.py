@@ -0,0 +1,77 @@
+"""Tests for the precomputed postag decode table."""
+
+import json
+
+import pytest
+
+from app.postag_table import PostagTable
+from app.utils import parse_postag
+
+API = "/AntigoneApp/api"
+
+TAGS = ["v3saia---", "n-s---mg-", "a-p---fnc", "u--------"]
+
+
+def test_decode_matches_parse_postag():
+    table = PostagTable(TAGS)
+    for tag in TAGS + ["d--------", "", None]:
+        assert table.decode(tag) == parse_postag(tag)
+        assert json.loads(table.json(tag)) == json.loads(json.dumps(parse_postag(tag)))
+    assert table.decode_many(["n-s---mg-", "v3saia---"]) == [parse_postag(t) for t in TAGS[1::-1]]
+
+
+def test_decoded_features_are_shared_and_read_only():
+    table = PostagTable(TAGS)
+    features = table.decode("n-s---mg-")
+    assert table.decode("n-s---mg-") is features
+    with pytest.raises(TypeError):
+        features[8] = "dative"
+    with pytest.raises(TypeError):
+        features.update({8: "dative"})
+
+
+def test_postags_endpoint(client):
+    r = client.get(f"{API}/postags")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert list(body) == ["n-s---n--"]
+    assert body["n-s---n--"]["1"] == "noun"
+    r = client.get(f"{API}/postags", query_string={"tags": "v3saia---,n-s---n--"})
+    assert r.get_json()["v3saia---"]["4"] == "aorist"
+
+
+def test_postags_endpoint_skips_undecodable_tags(client):
+    r = client.get(f"{API}/postags", query_string={"tags": "zzzzzzzzz,short,n-s---n--"})
+    assert r.status_code == 200
+    assert list(r.get_json()) == ["n-s---n--"]
+
+
+def test_decode_unknown_letters_is_empty():
+    table = PostagTable(TAGS)
+    assert table.decode("zzzzzzzzz") == {}
+    assert json.loads(table.json("zzzzzzzzz")) == {}
+
+
+def test_corpus_tag_with_unknown_letters_does_not_break_search(app, client):
+    from app import db
+    from app.models import LemmaData
+
+    with app.app_context():
+        db.session.add(LemmaData(
+            lemma_id=501, line_number=42, lemma="πολις", form="πολις", postag="z--------",
+            normalized="πολις", norm_form="πολις", full_eng="polis", eng_lemma="polis",
+            form_eng="polis", norm_form_eng="polis", urn="",
+        ))
+        db.session.commit()
+
+    data = client.get(f"{API}/search", query_string={"mode": "word", "q": "polis"}).get_json()
+    assert 501 in [entry[0]["lemma_id"] for entry in data]
+    assert PostagTable(TAGS + ["z--------"]).decode("z--------") == {}
+
+
+def test_postags_body_is_serialized_like_the_app(app, client):
+    body = client.get(f"{API}/postags").get_data(as_text=True)
+    with app.app_context():
+        expected = app.json.dumps(json.loads(body), separators=(",", ":"))
+    assert body == expected
+    assert ", " not in body and body.isascii()
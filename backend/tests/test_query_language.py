@@ -0,0 +1,57 @@
+"""Tests for the structured query language (parser, planner, /query)."""
+
+import pytest
+
+from app.query_language import Term, parse_query, run_query
+
+API = "/AntigoneApp/api"
+
+
+def test_parse_fields_quotes_and_bare_words():
+    assert parse_query('lemma:λόγος case:gen def:"my brother" πολ') == [
+        Term("lemma", "λόγος"),
+        Term("case", "gen"),
+        Term("def", "my brother"),
+        Term("word", "πολ"),
+    ]
+    for bad in ("", "   ", "colour:red", 'def:""'):
+        with pytest.raises(ValueError):
+            parse_query(bad)
+
+
+def test_most_selective_predicate_runs_first(app):
+    with app.app_context():
+        rows, plan = run_query("speaker:TestSpeaker lemma:πολις lines:1-35")
+        assert [(r.lemma_id, r.line_number) for r in rows] == [(300, 30)]
+        assert [(s["predicate"], s["strategy"]) for s in plan] == [
+            ("lemma:πολις", "index"),
+            ("lines:1-35", "filter"),
+            ("speaker:TestSpeaker", "filter"),
+        ]
+
+
+def test_postag_and_speaker_predicates_intersect_as_bitmaps(app):
+    with app.app_context():
+        rows, plan = run_query("gender:neuter speaker:Chorus o")
+        assert rows == []
+        rows, plan = run_query("gender:neuter speaker:TestSpeaker o")
+        assert [r.line_number for r in rows] == [10, 20, 30]
+        assert [s["strategy"] for s in plan] == ["bitmap", "bitmap", "filter"]
+        assert plan[-1]["predicate"] == "word:o"
+
+
+def test_query_endpoint(client):
+    r = client.get(f"{API}/query", query_string={"q": "lemma:πολις case:-"})
+    assert r.status_code == 400
+    r = client.get(f"{API}/query", query_string={"q": "lemma:πολις"})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["count"] == 1 and body["next_cursor"] is None
+    assert body["results"][0][0]["line_number"] == 30
+    assert body["plan"][0]["predicate"] == "lemma:πολις"
+
+
+def test_exact_terms_accept_beta_code(app):
+    with app.app_context():
+        rows, _ = run_query("lemma:po/lis")
+        assert [row.lemma_id for row in rows] == [300]
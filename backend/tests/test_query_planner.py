@@ -0,0 +1,28 @@
+"""Unit tests for script classification in the search query planner."""
+
+from app.query_planner import (
+    BETA_CODE,
+    GREEK,
+    GREEK_COLUMNS,
+    LATIN,
+    LATIN_COLUMNS,
+    MIXED,
+    classify_script,
+    plan_query,
+)
+
+
+def test_classify_script():
+    assert classify_script("πολις") == GREEK
+    assert classify_script("Αντιγονη") == GREEK
+    assert classify_script("polis") == LATIN
+    assert classify_script("a)/") == BETA_CODE
+    assert classify_script("*)antigo/nh") == BETA_CODE
+    assert classify_script("πolis") == MIXED
+    assert classify_script("[") == MIXED
+
+
+def test_plan_picks_one_column_family():
+    assert plan_query("λογ").columns == GREEK_COLUMNS
+    assert plan_query("log").columns == LATIN_COLUMNS
+    assert plan_query("e)").columns == LATIN_COLUMNS
@@ -0,0 +1,163 @@
+"""Unit tests for the in-memory lexicon index (no database required)."""
+
+from app.search_index import LexiconIndex, LexiconRow
+
+
+def _row(lemma_id, line_number, form, **cols):
+    values = dict(
+        lemma=form, postag="n-s---n--", normalized=form, norm_form=form,
+        full_eng="", eng_lemma="", form_eng="", norm_form_eng="",
+    )
+    values.update(cols)
+    return LexiconRow(lemma_id=lemma_id, line_number=line_number, form=form, **values)
+
+
+def test_exact_then_prefix_then_contains():
+    index = LexiconIndex([
+        _row(1, 5, "αλογα"),
+        _row(2, 4, "λογος"),
+        _row(3, 9, "λογ"),
+    ])
+    found = [r.lemma_id for r in index.search("λογ", "λογ")]
+    assert found == [3, 2, 1]
+
+
+def test_ties_break_on_form_length_then_line():
+    index = LexiconIndex([
+        _row(1, 7, "αβγδε"),
+        _row(2, 3, "αβγδεζ"),
+        _row(3, 2, "αβγδε"),
+    ])
+    assert [r.lemma_id for r in index.search("αβγ", "αβγ")] == [3, 1, 2]
+
+
+def test_prefix_and_contains_fold_ascii_case_only():
+    index = LexiconIndex([_row(1, 1, "x", form_eng="*)Antigonh")])
+    assert [r.lemma_id for r in index.search("antig", "antig")] == [1]
+
+
+def test_short_query_ranks_by_tier_only():
+    """Within a tier, a short query orders by form length, not by column."""
+    index = LexiconIndex([
+        _row(1, 1, "αβ", eng_lemma="o"),
+        _row(2, 2, "αβγ", form_eng="o"),
+    ])
+    assert [r.lemma_id for r in index.search("o", "o")] == [1, 2]
+    # Three or more characters keep the per-column rank (form_eng before eng_lemma)
+    index = LexiconIndex([
+        _row(1, 1, "αβ", eng_lemma="ooo"),
+        _row(2, 2, "αβγ", form_eng="ooo"),
+    ])
+    assert [r.lemma_id for r in index.search("ooo", "ooo")] == [2, 1]
+
+
+def test_limit_caps_results():
+    index = LexiconIndex([_row(i, i, "αβ") for i in range(1, 20)])
+    assert len(index.search("αβ", "αβ", limit=5)) == 5
+
+
+def test_planner_limits_probes_to_query_script():
+    from app.query_planner import plan_query
+
+    row = _row(1, 1, "λογος", form_eng="logos", norm_form_eng="logos")
+    index = LexiconIndex([row])
+    assert index.search("logos", "logos", plan=plan_query("λογος")) == []
+    assert index.search("logos", "logos") == [row]
+
+
+def test_contains_tier_uses_fts_table_when_present(app):
+    from sqlalchemy import text
+    from app import db
+
+    with app.app_context():
+        db.session.execute(text(
+            "CREATE VIRTUAL TABLE lemma_search USING fts5("
+            "norm_form, normalized, form_eng, norm_form_eng, full_eng, eng_lemma, "
+            "content='lemma_data', content_rowid='rowid', tokenize='trigram')"
+        ))
+        db.session.execute(text("INSERT INTO lemma_search(lemma_search) VALUES('rebuild')"))
+        index = LexiconIndex.from_session(db.session)
+        assert index.substring_source is not None
+        assert [r.lemma_id for r in index.search("withxo", "withxo")] == [200]
+        # Trigram matching is case-insensitive; LIKE semantics only fold ASCII
+        assert index.search("ΠΟΛ", "ΠΟΛ") == []
+
+
+def test_substring_tier_skipped_once_limit_is_filled():
+    class RecordingSource:
+        calls = 0
+
+        def keys(self, needles, columns):
+            RecordingSource.calls += 1
+            return [(9, 9)]
+
+    rows = [_row(i, i, "λογος") for i in range(1, 4)] + [_row(9, 9, "αλογος")]
+    index = LexiconIndex(rows, substring_source=RecordingSource())
+    assert [r.lemma_id for r in index.search("λογ", "λογ", limit=3)] == [1, 2, 3]
+    assert RecordingSource.calls == 0
+    assert [r.lemma_id for r in index.search("λογ", "λογ", limit=4)] == [1, 2, 3, 9]
+    assert RecordingSource.calls == 1
+
+
+def test_line_filter_applies_before_the_limit():
+    rows = [_row(i, i, "λογος") for i in range(1, 10)]
+    index = LexiconIndex(rows)
+    found = index.search("λογ", "λογ", limit=2, line_numbers=frozenset({8, 9}))
+    assert [r.line_number for r in found] == [8, 9]
+
+
+def test_search_lines_examines_only_the_range():
+    index = LexiconIndex([
+        _row(1, 12, "λογ"),
+        _row(2, 11, "αλογα"),
+        _row(3, 30, "λογ"),
+        _row(4, 11, "λογος"),
+    ])
+    found = index.search_lines("λογ", "λογ", 10, 20)
+    assert [(r.line_number, r.lemma_id) for r in found] == [(11, 4), (11, 2), (12, 1)]
+
+
+
+def test_search_lines_ranks_short_queries_by_tier_like_search():
+    index = LexiconIndex([
+        _row(1, 5, "λογ"),
+        _row(2, 5, "λα", normalized="λοσ", norm_form="αβ"),
+    ])
+    assert [r.lemma_id for r in index.search("λο", "λο")] == [2, 1]
+    assert [r.lemma_id for r in index.search_lines("λο", "λο", 1, 10)] == [2, 1]
+    assert [r.lemma_id for r in index.search_lines("λογ", "λογ", 1, 10)] == [1]
+
+def test_occurrences_group_by_lemma_in_requested_order():
+    index = LexiconIndex([
+        _row(1, 30, "λογος"),
+        _row(2, 5, "πολις"),
+        _row(1, 3, "λογον"),
+        _row(2, 40, "πολεως"),
+    ])
+    found = index.occurrences([2, 1, 2])
+    assert [(r.lemma_id, r.line_number) for r in found] == [(2, 5), (2, 40), (1, 3), (1, 30)]
+    found = index.occurrences([2, 1], line_range=(4, 35))
+    assert [(r.lemma_id, r.line_number) for r in found] == [(2, 5), (1, 30)]
+
+
+def test_narrowed_pattern_keys_rank_like_a_fresh_search():
+    from app.query_planner import plan_query
+    from app.search_index import can_refine
+
+    index = LexiconIndex([
+        _row(1, 1, "x", form_eng="anti", eng_lemma="anti"),
+        _row(2, 2, "y", form_eng="antigonh"),
+        _row(3, 3, "z", form_eng="xantig"),
+        _row(4, 4, "w", form_eng="ant"),
+        _row(5, 5, "v", eng_lemma="Anti"),
+    ])
+    previous = ("ant", "ant", plan_query("ant"))
+    keys = index.pattern_keys(*previous)
+    for query in ("anti", "antig", "ANTI"):
+        current = (query, query, plan_query(query))
+        assert can_refine(previous, current)
+        narrowed = index.pattern_keys(*current, previous=keys)
+        assert narrowed == index.pattern_keys(*current)
+        assert index.search(query, query, pattern_keys=narrowed) == index.search(query, query)
+    assert not can_refine(previous, ("an", "an", plan_query("an")))
+    assert not can_refine(previous, ("αντ", "αντ", plan_query("αντ")))